@@ -0,0 +1,144 @@
+"""
+Admin API endpoints for runtime diagnostics. Superusers only.
+
+Settings changed here apply to the process that serves the request; with
+several workers, repeat the call against each one (or set them in .env).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.profiling import ProfilerBusy, cpu_profiler, create_profile_token, memory_profiler
+from app.models.user import User
+from app.schemas.admin import (
+    CPUProfileRequest, CPUProfileResult, LoopMonitorStatus, LoopMonitorUpdate, MemoryProfileRequest,
+    MemoryProfileResult, ProfileToken, RoomActivityList, RoomSortKey,
+)
+from app.websocket import broker, manager
+from app.websocket.connection_manager import STATS_WINDOW_SECONDS
+from app.api.auth import get_current_superuser
+
+router = APIRouter()
+
+
+@router.get("/loop-monitor", response_model=LoopMonitorStatus)
+async def get_loop_monitor(current_user: User = Depends(get_current_superuser)):
+    """
+    Get event-loop lag and slow-callback detection state.
+
+    Raises:
+        401: Not authenticated
+        403: Not a superuser
+    """
+    return loop_monitor.status()
+
+
+@router.patch("/loop-monitor", response_model=LoopMonitorStatus)
+async def update_loop_monitor(
+    update: LoopMonitorUpdate,
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Turn slow-callback detection on or off, or change its threshold.
+
+    Raises:
+        401: Not authenticated
+        403: Not a superuser
+        422: Invalid threshold
+    """
+    enable = update.slow_callback_detection
+    if enable is None:
+        enable = loop_monitor.slow_callback_detection
+
+    if enable:
+        loop_monitor.enable_slow_callback_detection(update.slow_callback_threshold_seconds)
+    else:
+        loop_monitor.disable_slow_callback_detection()
+        if update.slow_callback_threshold_seconds is not None:
+            loop_monitor.slow_callback_threshold = update.slow_callback_threshold_seconds
+    return loop_monitor.status()
+
+
+@router.get("/rooms", response_model=RoomActivityList)
+async def list_hot_rooms(
+    sort: RoomSortKey = Query("events_out_per_second", description="Field to rank rooms by"),
+    limit: int = Query(20, ge=1, le=500),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    List the busiest rooms on the serving process.
+
+    Rates are averaged over the last STATS_WINDOW_SECONDS from per-room
+    rolling counters kept by the connection manager. Slow consumers are
+    connections with a send slower than WS_SLOW_CONSUMER_SECONDS in that window.
+
+    Raises:
+        401: Not authenticated
+        403: Not a superuser
+    """
+    rooms = [manager.get_room_stats(room_id) for room_id in manager.get_active_rooms()]
+    rooms = [room for room in rooms if room is not None]
+    rooms.sort(key=lambda room: room[sort], reverse=True)
+
+    return {
+        "node_id": settings.NODE_ID,
+        "window_seconds": STATS_WINDOW_SECONDS,
+        "total_connections": manager.get_total_connections(),
+        "active_rooms": len(rooms),
+        "broker": broker.name,
+        "broker_pending_events": broker.pending_events(),
+        "rooms": rooms[:limit],
+    }
+
+
+@router.post("/profiling/cpu", response_model=CPUProfileResult)
+async def profile_cpu(
+    request: CPUProfileRequest,
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Sample the event loop's stack for `seconds` and write collapsed stacks
+    (flame graph input) to PROFILING_OUTPUT_DIR. Responds when sampling ends.
+
+    Raises:
+        401: Not authenticated
+        403: Not a superuser
+        409: A CPU profile is already running in this process
+    """
+    try:
+        return await cpu_profiler.run(request.seconds, request.interval_ms / 1000, request.top)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/profiling/memory", response_model=MemoryProfileResult)
+async def profile_memory(
+    request: MemoryProfileRequest,
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Trace allocations for `seconds`, then write a tracemalloc snapshot to
+    PROFILING_OUTPUT_DIR and return the largest allocation sites.
+
+    Raises:
+        401: Not authenticated
+        403: Not a superuser
+        409: A memory profile is already running in this process
+    """
+    try:
+        return await memory_profiler.run(request.seconds, request.frames, request.top)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/profiling/token", response_model=ProfileToken)
+async def issue_profile_token(current_user: User = Depends(get_current_superuser)):
+    """
+    Issue a short-lived token that profiles any HTTP request sending it as
+    the X-Profile header (see app.middleware.profiling).
+
+    Raises:
+        401: Not authenticated
+        403: Not a superuser
+    """
+    return create_profile_token(current_user.id)
@@ -12,6 +12,7 @@ from app.schemas.token import Token
 from app.services.auth import create_user, authenticate_user, get_user_by_email
 from app.core.security import create_access_token, decode_access_token
 from app.models.user import User
+from app.services.user_cache import user_cache
 
 
 router = APIRouter()
@@ -37,13 +38,30 @@ async def get_current_user(
     if email is None:
         raise credentials_exception
 
-    user = await get_user_by_email(db, email=email)
+    # Serve from the user cache when possible (saves a DB round trip per request)
+    user = user_cache.get(email)
+    if user is None:
+        generation = user_cache.generation()
+        user = await get_user_by_email(db, email=email)
+        if user is not None:
+            user_cache.set(email, user, generation)
+
     if user is None or not user.is_active:
         raise credentials_exception
 
     return user
 
 
+async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency that only lets superusers through."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superuser privileges required"
+        )
+    return current_user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     """
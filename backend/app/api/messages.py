@@ -1,20 +1,23 @@
 """
 Messages API endpoints for chat functionality.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.user import User
 from app.schemas.message import MessageCreate, MessageUpdate, MessageResponse
 from app.services.message import (
     create_message,
-    get_messages_by_room,
+    get_message_page,
     get_message_by_id,
     update_message,
     delete_message,
 )
+from app.services.room_cache import room_cache
+from app.services.room_stats import get_cached_room_version
+from app.core.etag import CACHE_CONTROL, room_etag, etag_matches, not_modified
 from app.api.auth import get_current_user
 
 router = APIRouter()
@@ -47,16 +50,31 @@ async def get_room_messages(
     room_id: int,
     skip: int = Query(0, ge=0, description="Number of messages to skip"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of messages to return"),
-    db: AsyncSession = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get all messages in a room with pagination.
     Returns messages in descending order (newest first).
+    Pages are served from the room content cache when possible.
+    Responses carry the room's ETag; If-None-Match returns 304 when nothing changed.
     Requires authentication.
     """
+    async def load_page(db: AsyncSession) -> bytes:
+        return await get_message_page(db, room_id, skip, limit)
+
     try:
-        return await get_messages_by_room(db, room_id, skip, limit)
+        # Conditional request: answered from the cached room version alone
+        headers = {}
+        version = await get_cached_room_version(room_id)
+        if version is not None:
+            etag = room_etag(room_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        body, cache_result = await room_cache.get_or_load("messages", room_id, skip, limit, load_page)
+        return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": cache_result})
     except HTTPException:
         raise
     except Exception as e:
@@ -69,7 +87,7 @@ async def get_room_messages(
 @router.get("/messages/{message_id}", response_model=MessageResponse)
 async def get_specific_message(
     message_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -1,21 +1,27 @@
 """
 Notes API endpoints for collaborative sticky notes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.user import User
-from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteBatchRequest, NoteBatchResponse
 from app.services.note import (
     create_note,
-    get_notes_by_room,
+    get_note_page,
     get_note_by_id,
     update_note,
     delete_note,
+    apply_note_batch,
 )
+from app.services.room_cache import room_cache
+from app.services.room_stats import get_cached_room_version
+from app.core.etag import CACHE_CONTROL, room_etag, etag_matches, not_modified
 from app.api.auth import get_current_user
+from app.websocket import broker
 
 router = APIRouter()
 
@@ -42,21 +48,82 @@ async def create_new_note(
         )
 
 
+@router.post("/rooms/{room_id}/notes:batch", response_model=NoteBatchResponse)
+async def batch_notes(
+    room_id: int,
+    batch_in: NoteBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create, update and delete many sticky notes in one request.
+    Operations run in a single transaction and results are returned per item,
+    in submission order. Successful changes are broadcast to the room as one
+    "notes_batch" event.
+    Requires authentication.
+    """
+    try:
+        results = await apply_note_batch(db, room_id, batch_in.operations, current_user)
+        response = NoteBatchResponse(results=results)
+
+        created, updated, deleted = [], [], []
+        for item in response.results:
+            if item.status == "created":
+                created.append(item.note.model_dump(mode="json"))
+            elif item.status == "updated":
+                updated.append(item.note.model_dump(mode="json"))
+            elif item.status == "deleted":
+                deleted.append(item.id)
+
+        if created or updated or deleted:
+            await broker.publish(room_id, {
+                "type": "notes_batch",
+                "data": {"created": created, "updated": updated, "deleted": deleted},
+                "user_id": current_user.id,
+                "room_id": room_id,
+                "timestamp": datetime.utcnow().isoformat(),
+            })
+
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to apply note batch: {str(e)}",
+        )
+
+
 @router.get("/rooms/{room_id}/notes", response_model=List[NoteResponse])
 async def get_room_notes(
     room_id: int,
     skip: int = Query(0, ge=0, description="Number of notes to skip"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of notes to return"),
-    db: AsyncSession = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get all sticky notes in a room with pagination.
     Returns notes in descending order (newest first).
+    Pages are served from the room content cache when possible.
+    Responses carry the room's ETag; If-None-Match returns 304 when nothing changed.
     Requires authentication.
     """
+    async def load_page(db: AsyncSession) -> bytes:
+        return await get_note_page(db, room_id, skip, limit)
+
     try:
-        return await get_notes_by_room(db, room_id, skip, limit)
+        # Conditional request: answered from the cached room version alone
+        headers = {}
+        version = await get_cached_room_version(room_id)
+        if version is not None:
+            etag = room_etag(room_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        body, cache_result = await room_cache.get_or_load("notes", room_id, skip, limit, load_page)
+        return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": cache_result})
     except HTTPException:
         raise
     except Exception as e:
@@ -69,7 +136,7 @@ async def get_room_notes(
 @router.get("/notes/{note_id}", response_model=NoteResponse)
 async def get_specific_note(
     note_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -1,18 +1,24 @@
 """
 Room API endpoints with authentication.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
 
-from app.db.session import get_db
-from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse
+from app.db.session import get_db, get_read_db
+from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomListItem
 from app.services.room import create_room, get_rooms, get_room_by_id, update_room, delete_room
+from app.services.room_stats import get_cached_room_version
+from app.core.etag import CACHE_CONTROL, room_etag, etag_matches, not_modified
 from app.api.auth import get_current_user
 from app.models.user import User
+from app.websocket.connection_manager import manager
+from app.websocket import broker
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post("/", response_model=RoomResponse, status_code=status.HTTP_201_CREATED)
@@ -35,20 +41,34 @@ async def create_new_room(
         )
 
 
-@router.get("/", response_model=List[RoomResponse])
+@router.get("/", response_model=List[RoomListItem])
 async def list_rooms(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    sort: Literal["created", "activity"] = Query("created", description="created (newest first) or activity (most recently active first)"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all rooms with pagination.
+    Get all rooms with pagination, including message/note counts,
+    last activity time and live WebSocket connection count.
 
     Requires authentication.
     """
     try:
-        return await get_rooms(db, skip=skip, limit=limit)
+        rooms = await get_rooms(db, skip=skip, limit=limit, sort=sort)
+
+        room_ids = [room["id"] for room in rooms]
+        try:
+            connections = await broker.get_room_connections(room_ids)
+        except Exception as e:
+            # Broker unavailable: fall back to this node's connections
+            logger.warning(f"Falling back to local connection counts: {e}")
+            connections = {room_id: manager.get_room_connection_count(room_id) for room_id in room_ids}
+
+        for room in rooms:
+            room["active_connections"] = connections.get(room["id"], 0)
+        return rooms
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -59,15 +79,26 @@ async def list_rooms(
 @router.get("/{room_id}", response_model=RoomResponse)
 async def get_room(
     room_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific room by ID.
+    Responses carry the room's ETag; If-None-Match returns 304 when nothing changed.
 
     Requires authentication.
     """
     try:
+        version = await get_cached_room_version(room_id)
+        if version is not None:
+            etag = room_etag(room_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = CACHE_CONTROL
+
         room = await get_room_by_id(db, room_id)
         if not room:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
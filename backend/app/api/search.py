@@ -0,0 +1,40 @@
+"""
+Search API endpoints for room full-text search.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.db.session import get_read_db
+from app.models.user import User
+from app.schemas.search import SearchResponse
+from app.services.search import search_room
+from app.api.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/rooms/{room_id}/search", response_model=SearchResponse)
+async def search_room_content(
+    room_id: int,
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Full-text search over a room's messages and notes.
+    Results are ranked by relevance and paginated with an opaque cursor.
+    Requires authentication.
+    """
+    try:
+        hits, next_cursor = await search_room(db, room_id, q, limit, cursor)
+        return {"results": hits, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search room: {str(e)}",
+        )
@@ -5,27 +5,47 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status, Query
 from typing import Optional
 import json
 import logging
+import time
 from datetime import datetime
 
-from app.websocket.connection_manager import manager
-from app.websocket.redis_pubsub import redis_manager
+from app.websocket.connection_manager import manager, ws_dropped_connections_total
+from app.websocket import broker
+from app.websocket.broker import event_type_label
+from app.core.metrics import registry
+from app.core.tracing import TRACE_FIELD, start_trace, mark_published, client_payload
 from app.core.security import verify_token
-from app.db.session import get_db
+from app.db.session import session_scope
+from app.db.instrumentation import track_queries
 from app.models.user import User
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from app.services.auth import get_user_by_email
+from app.services.user_cache import user_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+ws_events_received_total = registry.counter(
+    "ws_events_received_total", "Events received from WebSocket clients, by type", ["type"]
+)
+ws_rejected_connections_total = registry.counter(
+    "ws_rejected_connections_total", "WebSocket connections rejected at authentication"
+)
+ws_invalid_events_total = registry.counter(
+    "ws_invalid_events_total", "WebSocket frames that were not valid JSON events"
+)
 
-async def get_current_user_ws(token: str, db: AsyncSession) -> Optional[User]:
+# Query accounting labels (see app.db.instrumentation)
+WS_CONNECT_OPERATION = "WS /ws/room/{room_id} connect"
+WS_EVENT_OPERATION = "WS /ws/room/{room_id} event"
+
+
+async def get_current_user_ws(token: str) -> Optional[User]:
     """
     Authenticate user from WebSocket token.
+    Uses the user cache first and only borrows a short-lived
+    database session on a cache miss.
 
     Args:
         token: JWT token from query parameter
-        db: Database session
 
     Returns:
         User object if authenticated, None otherwise
@@ -40,16 +60,44 @@ async def get_current_user_ws(token: str, db: AsyncSession) -> Optional[User]:
         if email is None:
             return None
 
-        # Get user from database
-        result = await db.execute(select(User).where(User.email == email))
-        user = result.scalar_one_or_none()
+        user = user_cache.get(email)
+        if user is None:
+            # Get user from database
+            generation = user_cache.generation()
+            async with session_scope() as db:
+                user = await get_user_by_email(db, email)
+            if user is not None:
+                user_cache.set(email, user, generation)
+
+        if user is None or not user.is_active:
+            return None
 
         return user
     except Exception as e:
-        logger.error(f"WebSocket authentication error: {e}")
+        logger.error("WebSocket authentication error: %s", e)
         return None
 
 
+def enrich_event(message_data: dict, user: User, room_id: int) -> dict:
+    """
+    Add sender and room metadata to an event received from a client.
+
+    Args:
+        message_data: Decoded client event (mutated)
+        user: The authenticated sender
+        room_id: The room the event was sent to
+
+    Returns:
+        The enriched event
+    """
+    message_data["user_id"] = user.id
+    message_data["user_email"] = user.email
+    message_data["user_name"] = user.full_name or user.email
+    message_data["room_id"] = room_id
+    message_data["timestamp"] = datetime.utcnow().isoformat()
+    return message_data
+
+
 @router.websocket("/ws/room/{room_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -72,32 +120,37 @@ async def websocket_endpoint(
         room_id: The room ID to join
         token: JWT authentication token (query parameter)
     """
-    # Get database session
-    db_gen = get_db()
-    db: AsyncSession = await anext(db_gen)
+    user: Optional[User] = None
 
     try:
-        # Authenticate user
-        user = await get_current_user_ws(token, db)
+        # Authenticate user. Any DB lookup borrows a short-lived session so the
+        # socket doesn't hold a pooled connection for its whole lifetime.
+        # Any later DB work must also borrow its own session_scope().
+        with track_queries(WS_CONNECT_OPERATION):
+            user = await get_current_user_ws(token)
 
         if not user:
-            logger.warning(f"Unauthorized WebSocket connection attempt to room {room_id}")
+            logger.warning("Unauthorized WebSocket connection attempt to room %s", room_id)
+            ws_rejected_connections_total.inc()
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid authentication token")
             return
 
         # Accept connection and register with ConnectionManager
         await manager.connect(websocket, room_id, user.id)
+        await broker.set_room_connections(room_id, manager.get_room_connection_count(room_id))
 
-        # Subscribe to Redis channel for this room
-        async def handle_redis_message(message: dict):
-            """Callback for Redis pub/sub messages"""
+        # Subscribe to this room's events from the broker
+        async def handle_room_event(message: dict):
+            """Callback for room events delivered by the broker"""
             try:
                 # Broadcast to all local connections in this room
-                await manager.broadcast_to_room(json.dumps(message), room_id)
+                await manager.broadcast_to_room(
+                    json.dumps(client_payload(message)), room_id, trace=message.get(TRACE_FIELD)
+                )
             except Exception as e:
-                logger.error(f"Error handling Redis message: {e}")
+                logger.error("Error handling room event in room %s: %s", room_id, e)
 
-        await redis_manager.subscribe(room_id, handle_redis_message)
+        await broker.subscribe(room_id, handle_room_event)
 
         # Send join notification
         join_message = {
@@ -112,61 +165,67 @@ async def websocket_endpoint(
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        # Publish to Redis (will be broadcast to all servers/connections)
-        await redis_manager.publish(room_id, join_message)
+        # Publish to the broker (will be broadcast to all servers/connections)
+        await broker.publish(room_id, join_message)
 
         # Listen for messages from this client
         while True:
             try:
                 # Receive message from WebSocket
                 data = await websocket.receive_text()
-                message_data = json.loads(data)
+                received_monotonic, received_at = time.perf_counter(), time.time()
+                manager.record_inbound(room_id)
+                with track_queries(WS_EVENT_OPERATION):
+                    message_data = enrich_event(json.loads(data), user, room_id)
 
-                # Add metadata
-                message_data["user_id"] = user.id
-                message_data["user_email"] = user.email
-                message_data["user_name"] = user.full_name or user.email
-                message_data["room_id"] = room_id
-                message_data["timestamp"] = datetime.utcnow().isoformat()
+                    # Handle different message types
+                    message_type = message_data.get("type")
+                    ws_events_received_total.labels(event_type_label(message_type)).inc()
 
-                # Handle different message types
-                message_type = message_data.get("type")
+                    if message_type == "ping":
+                        # Respond to heartbeat
+                        await websocket.send_text(json.dumps({
+                            "type": "pong",
+                            "timestamp": datetime.utcnow().isoformat()
+                        }))
+                        continue
 
-                if message_type == "ping":
-                    # Respond to heartbeat
-                    await websocket.send_text(json.dumps({
-                        "type": "pong",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }))
-                    continue
+                    # Sampled latency tracing (stamps travel with the event)
+                    trace = start_trace(message_data, received_at)
+                    if trace:
+                        mark_published(trace, received_monotonic)
 
-                # Publish message to Redis (will fan-out to all servers)
-                await redis_manager.publish(room_id, message_data)
+                    # Publish message to the broker (will fan-out to all servers)
+                    await broker.publish(room_id, message_data)
 
-                logger.debug(f"User {user.id} sent {message_type} to room {room_id}")
+                    logger.debug("User %s sent %s to room %s", user.id, message_type, room_id)
 
             except WebSocketDisconnect:
-                logger.info(f"User {user.id} disconnected from room {room_id}")
+                logger.info("User %s disconnected from room %s", user.id, room_id)
                 break
             except json.JSONDecodeError:
-                logger.warning(f"Invalid JSON from user {user.id}")
+                ws_invalid_events_total.inc()
+                logger.warning("Invalid JSON from user %s", user.id)
                 await websocket.send_text(json.dumps({
                     "type": "error",
                     "message": "Invalid JSON format"
                 }))
             except Exception as e:
-                logger.error(f"Error processing message: {e}")
+                ws_dropped_connections_total.labels("error").inc()
+                logger.error("Error processing message: %s", e)
                 break
 
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
     finally:
         # Cleanup on disconnect
         manager.disconnect(websocket, room_id)
+        if user:
+            await broker.set_room_connections(room_id, manager.get_room_connection_count(room_id))
 
-        # If no more connections in this room, unsubscribe from Redis
+        # If no more connections in this room, unsubscribe from the broker
         if manager.get_room_connection_count(room_id) == 0:
-            await redis_manager.unsubscribe(room_id)
+            await broker.unsubscribe(room_id)
 
         # Send leave notification
         if user:
@@ -183,7 +242,4 @@ async def websocket_endpoint(
             }
 
             # Publish leave message
-            await redis_manager.publish(room_id, leave_message)
-
-        # Close database session
-        await db.close()
+            await broker.publish(room_id, leave_message)
@@ -2,8 +2,11 @@
 Application configuration using Pydantic Settings.
 Loads environment variables from .env file.
 """
+import os
+import socket
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -16,19 +19,100 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    # Identifies this worker in shared Redis state (defaults to host-pid)
+    NODE_ID: str = Field(default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}")
 
     # Database (NeonDB PostgreSQL)
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_PREWARM: int = 0  # Connections to open at startup (0 = lazy)
+    DB_AUTO_CREATE: bool = False  # Run create_all at startup (dev only; Alembic owns the schema)
+    DB_ECHO: bool = False  # Log every SQL statement
+    DB_SSL: str = "require"  # asyncpg ssl mode ("disable" for a local Postgres without TLS)
+    DB_QUERY_WARN_THRESHOLD: int = 10  # Warn when one request/WebSocket event issues more queries (0 = off)
+
+    # Optional read replica for list/detail GET endpoints
+    DATABASE_READ_URL: Optional[str] = None
+    READ_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Fall back to primary above this lag
+    READ_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    READ_YOUR_WRITES_WINDOW_SECONDS: float = 10.0  # Pin a writer's reads to primary
+
+    # Message partition maintenance (python -m app.db.partitions)
+    MESSAGE_PARTITION_MONTHS_AHEAD: int = 3
+    MESSAGE_RETENTION_MONTHS: int = 12  # Older partitions are archived to disk
+    MESSAGE_ARCHIVE_DIR: str = "archive/messages"
 
     # JWT Authentication
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing (bcrypt runs in a bounded worker pool, off the event loop)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Room event broker: "redis" or "postgres" (multi-node), "memory" (single node, no Redis needed)
+    BROKER_BACKEND: Literal["redis", "postgres", "memory"] = "redis"
+    # Postgres LISTEN/NOTIFY broker (needs a session-level connection, not a transaction pooler)
+    PG_BROKER_URL: Optional[str] = None  # Defaults to DATABASE_URL
+    PG_BROKER_POOL_SIZE: int = 4  # Connections used for publishing
+    PG_BROKER_KEEPALIVE_SECONDS: float = 15.0  # Check the LISTEN connection this often
+    PG_BROKER_PAYLOAD_RETENTION_SECONDS: int = 300  # Keep oversized events this long for receivers
+
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    # Room events are published in pipelined batches over a dedicated pool
+    REDIS_PUBLISH_POOL_SIZE: int = 2  # Connections (and ordered shards of rooms) for publishing
+    REDIS_PUBLISH_MAX_BATCH: int = 100  # Events per pipeline
+    REDIS_PUBLISH_MAX_LATENCY_SECONDS: float = 0.001  # Wait this long to fill a batch (0 = no wait)
+    REDIS_PUBLISH_MAX_QUEUED: int = 10000  # Per shard; publishers wait when it is full
+    # A connection whose single send takes longer than this counts as a slow consumer
+    WS_SLOW_CONSUMER_SECONDS: float = 0.1
+
+    # Per-node live connection counts expire this long after a node stops refreshing them
+    ROOM_PRESENCE_TTL_SECONDS: int = 30
+
+    # Authenticated-user cache
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+
+    # Room message/note listing cache (local + Redis, invalidated on writes)
+    ROOM_CACHE_ENABLED: bool = True
+    ROOM_CACHE_MAX_SIZE: int = 5000  # Local entries (one per room/kind/page shape)
+    ROOM_CACHE_TTL_SECONDS: float = 300.0
+    ROOM_CACHE_INVALIDATION_HOLD_SECONDS: float = 1.0  # Don't re-cache a room this soon after a write
+
+    # Event latency tracing (WebSocket -> Redis -> fan-out)
+    TRACE_SAMPLE_RATE: float = 0.01  # Fraction of client events traced (0 = only client-requested traces)
+    TRACE_ECHO_TO_CLIENTS: bool = False  # Include trace_id in broadcasts of sampled events
+
+    # Event-loop health (lag probe always on; stall detection toggleable at /api/admin/loop-monitor)
+    LOOP_LAG_PROBE_INTERVAL_SECONDS: float = 0.5
+    LOOP_SLOW_CALLBACK_DETECTION: bool = False  # Log the stack of callbacks that block the loop
+    LOOP_SLOW_CALLBACK_THRESHOLD_SECONDS: float = 0.1
+
+    # On-demand profiling (/api/admin/profiling); files stay on the worker that made them
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    PROFILING_TOKEN_TTL_SECONDS: int = 900  # Lifetime of X-Profile request tokens
+
+    # HTTP response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller responses are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_ENABLED: bool = True  # Only takes effect when the brotli package is installed
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Logging (see app.core.logging_config)
+    LOG_LEVEL: str = "WARNING"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    # Keep 1 in 1/rate records below WARNING from these loggers ("logger=rate,...")
+    LOG_SAMPLE_RATES: str = "app.websocket.connection_manager=0.1,app.api.websocket=0.1"
+    LOG_RATE_LIMIT_BURST: int = 10  # Identical warnings/errors let through per interval (0 = unlimited)
+    LOG_RATE_LIMIT_INTERVAL_SECONDS: float = 60.0
 
     # CORS - Store as string, parse as list via property
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
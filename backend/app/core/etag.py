@@ -0,0 +1,52 @@
+"""
+HTTP conditional request helpers (ETag / If-None-Match).
+"""
+from typing import Optional
+
+from fastapi import Response, status
+
+# Clients may keep responses but must revalidate them before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def room_etag(room_id: int, version: int) -> str:
+    """
+    Weak ETag for any representation derived from a room's current version.
+
+    Args:
+        room_id: The room ID
+        version: The room's version counter (room_stats.version)
+    """
+    return f'W/"room-{room_id}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        if_none_match: Raw If-None-Match header value, if sent
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    current = opaque(etag)
+    return any(opaque(tag) == current for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -0,0 +1,153 @@
+"""
+Application logging: JSON or text output, per-logger sampling of
+high-frequency records, and rate limiting of repeated warnings/errors.
+
+Hot-path log calls use lazy %-style arguments (logger.info("... %s", x))
+so nothing is formatted for records that are filtered, sampled out or
+rate limited. The unformatted message template is also what groups repeats
+for rate limiting, so "Error broadcasting to connection: %s" from a broken
+client counts as one message however its arguments vary.
+"""
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+# LogRecord attributes that aren't user-supplied `extra` fields
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields are included as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "node": settings.NODE_ID,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    """Plain text, noting when records were sampled or similar ones suppressed."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            line += f" (suppressed {suppressed} similar)"
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every `every` records below WARNING from a logger.
+    Kept records get a `sampled` field (the sampling factor) so counts can be scaled.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if self.every == 0:
+            return False
+        self._seen += 1
+        if self._seen % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` records per (logger, level, message template) through
+    every `interval` seconds, for WARNING and above. The first record after a
+    suppressed stretch carries a `suppressed` count.
+    """
+
+    def __init__(self, burst: int, interval: float):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[Tuple[str, int, str], list] = {}  # key -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                if len(self._windows) > 10000:
+                    self._windows.clear()  # Bound memory if templates are unbounded (f-strings)
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "logger=rate,logger=rate" into a dict."""
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging():
+    """
+    Configure the root logger from settings (LOG_LEVEL, LOG_FORMAT,
+    LOG_SAMPLE_RATES and LOG_RATE_LIMIT_*). With LOG_FORMAT=json, uvicorn's
+    own handlers are switched to JSON too.
+    """
+    formatter = JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter()
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(formatter)
+    handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_BURST, settings.LOG_RATE_LIMIT_INTERVAL_SECONDS))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    for name, rate in _parse_sample_rates(settings.LOG_SAMPLE_RATES).items():
+        logger = logging.getLogger(name)
+        logger.filters = [f for f in logger.filters if not isinstance(f, SamplingFilter)]
+        if rate < 1:
+            logger.addFilter(SamplingFilter(rate))
+
+    if settings.LOG_FORMAT == "json":
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            for uvicorn_handler in logging.getLogger(name).handlers:
+                uvicorn_handler.setFormatter(formatter)
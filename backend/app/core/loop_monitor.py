@@ -0,0 +1,185 @@
+"""
+Event-loop lag probe and slow-callback (stall) detector.
+
+The lag probe is a task that sleeps for a fixed interval and measures how late
+it wakes up. That delay is how long anything else waiting on the loop
+(WebSocket frames, Redis deliveries, HTTP requests) was held up.
+
+The stall detector is a watchdog thread that pings the loop with
+call_soon_threadsafe. If the ping isn't serviced within the threshold, some
+callback is blocking the loop; the watchdog logs the loop thread's current
+stack, which names the offending coroutine, and records how long the stall
+lasted. It can be switched on and off at runtime (see app.api.admin).
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+loop_lag_seconds = registry.gauge(
+    "event_loop_lag_seconds", "Most recent event-loop lag measured by the probe"
+)
+loop_lag_observed_seconds = registry.histogram(
+    "event_loop_lag_observed_seconds", "Event-loop lag measured by the probe", buckets=LAG_BUCKETS
+)
+loop_stalls_total = registry.counter(
+    "event_loop_stalls_total", "Times the loop was blocked longer than the slow-callback threshold"
+)
+loop_stall_seconds = registry.histogram(
+    "event_loop_stall_seconds", "Duration of detected event-loop stalls", buckets=LAG_BUCKETS
+)
+
+_CO_COROUTINE = 0x0080  # inspect.CO_COROUTINE
+
+
+def _coroutine_names(frame) -> str:
+    """Coroutine functions on a stack, outermost first (e.g. "websocket_endpoint -> broadcast_to_room")."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_flags & _CO_COROUTINE:
+            names.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_name}")
+        frame = frame.f_back
+    return " -> ".join(reversed(names)) or "<no coroutine>"
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and, when enabled, reports callbacks that block the loop.
+    """
+
+    def __init__(self):
+        self.probe_interval = settings.LOOP_LAG_PROBE_INTERVAL_SECONDS
+        self.slow_callback_threshold = settings.LOOP_SLOW_CALLBACK_THRESHOLD_SECONDS
+        self.last_lag: float = 0.0
+        self.stalls: int = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop = threading.Event()
+
+    @property
+    def slow_callback_detection(self) -> bool:
+        return self._watchdog is not None and self._watchdog.is_alive()
+
+    async def start(self):
+        """Start the lag probe (and the stall detector if enabled in settings)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._probe_task = asyncio.create_task(self._probe())
+        if settings.LOOP_SLOW_CALLBACK_DETECTION:
+            self.enable_slow_callback_detection()
+
+    async def stop(self):
+        """Stop the probe and the stall detector."""
+        self.disable_slow_callback_detection()
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def enable_slow_callback_detection(self, threshold: Optional[float] = None):
+        """
+        Start (or retune) the stall detector.
+
+        Args:
+            threshold: Seconds a single loop step may block before it is reported
+        """
+        if threshold is not None:
+            self.slow_callback_threshold = threshold
+        if self.slow_callback_detection or self._loop is None:
+            return
+        # A fresh event per thread, so a watchdog that is still winding down can't be revived
+        self._watchdog_stop = threading.Event()
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(self._watchdog_stop,), name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(f"Slow-callback detection enabled (threshold {self.slow_callback_threshold * 1000:.0f} ms)")
+
+    def disable_slow_callback_detection(self):
+        """
+        Stop the stall detector.
+
+        Doesn't wait for the thread: it may be waiting on a ping that this
+        loop can only answer once we return. It exits on its own shortly after.
+        """
+        if self._watchdog is None:
+            return
+        self._watchdog_stop.set()
+        self._watchdog = None
+        logger.info("Slow-callback detection disabled")
+
+    def status(self) -> dict:
+        return {
+            "lag_seconds": self.last_lag,
+            "probe_interval_seconds": self.probe_interval,
+            "slow_callback_detection": self.slow_callback_detection,
+            "slow_callback_threshold_seconds": self.slow_callback_threshold,
+            "stalls_detected": self.stalls,
+        }
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.probe_interval
+            await asyncio.sleep(self.probe_interval)
+            lag = max(0.0, loop.time() - expected)
+            self.last_lag = lag
+            loop_lag_seconds.set(lag)
+            loop_lag_observed_seconds.observe(lag)
+
+    def _watch(self, stop: threading.Event):
+        """Watchdog thread: ping the loop and report when it doesn't answer in time."""
+        while not stop.is_set():
+            answered = threading.Event()
+            started = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # Loop closed
+
+            if not answered.wait(self.slow_callback_threshold):
+                self._report_stall(started, answered, stop)
+
+            stop.wait(self.slow_callback_threshold)
+
+    def _report_stall(self, started: float, answered: threading.Event, stop: threading.Event):
+        # Disabling the detector keeps the loop from answering until it returns - not a stall
+        if stop.is_set():
+            return
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+        coroutines = _coroutine_names(frame)
+        del frame
+        logger.warning(
+            f"Event loop blocked for over {self.slow_callback_threshold * 1000:.0f} ms in {coroutines}\n{stack}"
+        )
+
+        # Wait for the loop to recover to measure the whole stall
+        while not answered.wait(0.5):
+            if stop.is_set():
+                return
+        duration = time.monotonic() - started
+        self.stalls += 1
+        loop_stalls_total.inc()
+        loop_stall_seconds.observe(duration)
+        logger.warning(f"Event loop stall in {coroutines} lasted {duration * 1000:.0f} ms")
+
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor()
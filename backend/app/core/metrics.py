@@ -0,0 +1,276 @@
+"""
+Lightweight in-process metrics registry.
+Counters, gauges and histograms that are cheap enough to update on every message.
+Rendered in the Prometheus text exposition format by /metrics.
+"""
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Default latency buckets in seconds (1ms .. 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """
+    Base metric with optional labels.
+
+    Children are created once per label combination and cached, so the
+    hot path is a dict lookup plus an attribute update.
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *labelvalues):
+        """Get (or create) the child for the given label values."""
+        key = tuple(str(value) for value in labelvalues)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def remove(self, *labelvalues):
+        """Drop a label combination (e.g. a room that no longer has connections)."""
+        self._children.pop(tuple(str(value) for value in labelvalues), None)
+
+    def clear(self):
+        """Drop every label combination (e.g. before a collect callback repopulates them)."""
+        if self.labelnames:
+            self._children.clear()
+
+    def samples(self) -> List[Tuple[Tuple[str, ...], object]]:
+        return list(self._children.items())
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+
+    If `collect` is given it is called at snapshot time to refresh the value,
+    which keeps expensive reads off the hot path.
+    """
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[["Gauge"], None]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+
+class Histogram(Metric):
+    """Bucketed distribution of observed values."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+
+class MetricsRegistry:
+    """
+    Holds all metrics for this process.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        """
+        Add a metric, or return the one already registered under its name.
+
+        Raises:
+            ValueError: A metric with that name exists with a different type, labels or buckets
+        """
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if (
+                type(existing) is not type(metric)
+                or existing.labelnames != metric.labelnames
+                or getattr(existing, "buckets", None) != getattr(metric, "buckets", None)
+            ):
+                raise ValueError(
+                    f"Metric {metric.name} is already registered as a {existing.type_name} "
+                    f"with labels {existing.labelnames}"
+                )
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              collect: Optional[Callable[[Gauge], None]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collect(self) -> List[Metric]:
+        """Refresh callback-driven gauges and return all metrics."""
+        for metric in self._metrics.values():
+            collect = getattr(metric, "collect", None)
+            if collect is not None:
+                collect(metric)
+        return list(self._metrics.values())
+
+    def snapshot(self) -> dict:
+        """
+        JSON-friendly view of all metrics.
+
+        Returns:
+            Dictionary of metric name -> value (or per-label values)
+        """
+        result = {}
+        for metric in self.collect():
+            values = {}
+            for labelvalues, child in metric.samples():
+                key = ",".join(f"{n}={v}" for n, v in zip(metric.labelnames, labelvalues)) or "value"
+                if isinstance(child, _HistogramChild):
+                    values[key] = {"count": child.count, "sum": round(child.sum, 6)}
+                else:
+                    values[key] = child.value
+            result[metric.name] = values.get("value", values) if not metric.labelnames else values
+        return result
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format (0.0.4).
+
+        Returns:
+            Exposition text, one sample per line
+        """
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for labelvalues, child in metric.samples():
+                labels = list(zip(metric.labelnames, labelvalues))
+                if isinstance(child, _HistogramChild):
+                    cumulative = 0
+                    for bound, count in zip((*child.buckets, math.inf), child.counts):
+                        cumulative += count
+                        bucket_labels = _format_labels(labels + [("le", _format_value(bound))])
+                        lines.append(f"{metric.name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {child.count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+# Global metrics registry
+registry = MetricsRegistry()
@@ -0,0 +1,243 @@
+"""
+On-demand CPU and memory profiling of a running worker (see app.api.admin).
+
+- CPU: a sampling profiler. A thread snapshots the event-loop thread's stack
+  every few milliseconds (like the loop monitor's stall detector) and counts
+  identical stacks. Output is in collapsed-stack format, one
+  "frame;frame;frame count" line per stack, which flamegraph.pl and
+  speedscope read directly. Overhead is one stack walk per sample, and
+  nothing runs between profiles.
+- Memory: a tracemalloc snapshot of allocations made while tracing (the
+  tracing window, unless tracemalloc was already running). The snapshot file
+  loads with tracemalloc.Snapshot.load for comparison and grouping.
+- Single HTTP requests: cProfile around the request (app.middleware.profiling),
+  enabled with a short-lived profiling token from the admin API.
+
+Files are written to PROFILING_OUTPUT_DIR on the worker that served the call.
+"""
+import asyncio
+import cProfile
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+PROFILE_TOKEN_SCOPE = "profile"
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile of the same kind is already running in this process."""
+
+
+def output_path(kind: str, suffix: str) -> Path:
+    """A new file in PROFILING_OUTPUT_DIR named after the kind, node and time."""
+    directory = Path(settings.PROFILING_OUTPUT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    return directory / f"{kind}-{settings.NODE_ID}-{stamp}{suffix}"
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{code.co_firstlineno}"
+
+
+class SamplingProfiler:
+    """Samples the event-loop thread's stack from a background thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    async def run(self, seconds: float, interval: float, top: int = 20) -> dict:
+        """
+        Profile the calling event loop's thread for a while.
+
+        Args:
+            seconds: How long to sample
+            interval: Seconds between samples
+            top: Number of functions to summarize
+
+        Returns:
+            Output file, sample count and the functions with the most samples
+
+        Raises:
+            ProfilerBusy: A CPU profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A CPU profile is already running")
+        try:
+            thread_id = threading.get_ident()
+            stacks: Counter = Counter()
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample, args=(thread_id, interval, stacks, stop), name="cpu-profiler", daemon=True
+            )
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.to_thread(sampler.join)
+            return self._write(stacks, seconds, interval, top)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _sample(thread_id: int, interval: float, stacks: Counter, stop: threading.Event):
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                stacks[";".join(reversed(labels))] += 1
+
+    @staticmethod
+    def _write(stacks: Counter, seconds: float, interval: float, top: int) -> dict:
+        path = output_path("cpu", ".folded")
+        with path.open("w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for function in set(frames):
+                total[function] += count
+
+        samples = sum(stacks.values())
+        return {
+            "file": str(path),
+            "seconds": seconds,
+            "interval_seconds": interval,
+            "samples": samples,
+            "top": [
+                {"function": function, "own_samples": count, "total_samples": total[function]}
+                for function, count in own.most_common(top)
+            ],
+        }
+
+
+class MemoryProfiler:
+    """Takes tracemalloc snapshots of allocations made during a tracing window."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    async def run(self, seconds: float, frames: int, top: int = 20) -> dict:
+        """
+        Trace allocations for a while and snapshot what is still allocated.
+
+        If tracemalloc is already tracing (e.g. PYTHONTRACEMALLOC), the
+        snapshot covers everything since it started and tracing is left on.
+
+        Args:
+            seconds: How long to trace before the snapshot
+            frames: Stack frames stored per allocation
+            top: Number of allocation sites to summarize
+
+        Returns:
+            Output file, traced memory and the largest allocation sites
+
+        Raises:
+            ProfilerBusy: A memory profile is already running
+        """
+        if self._lock.locked():
+            raise ProfilerBusy("A memory profile is already running")
+        async with self._lock:
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start(frames)
+            try:
+                await asyncio.sleep(seconds)
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                if started_here:
+                    tracemalloc.stop()
+
+            path = output_path("memory", ".tracemalloc")
+            await asyncio.to_thread(snapshot.dump, str(path))
+            snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            stats = snapshot.statistics("lineno")[:top]
+
+        return {
+            "file": str(path),
+            "seconds": seconds,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "top": [
+                {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "size_bytes": stat.size, "count": stat.count}
+                for stat in stats
+            ],
+        }
+
+
+class RequestProfiler:
+    """cProfile for single HTTP requests, one at a time per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start profiling, or return None if another request is being profiled."""
+        if not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile: cProfile.Profile, path: Path):
+        """Stop profiling and write the stats (pstats format) to path."""
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+        profile.dump_stats(str(path))
+
+
+def create_profile_token(user_id: int) -> Dict[str, object]:
+    """
+    Issue a token that enables per-request profiling (X-Profile header).
+
+    The token carries no "sub", so it can't be used to authenticate.
+
+    Args:
+        user_id: The superuser requesting it (recorded in the token)
+
+    Returns:
+        Token and seconds until it expires
+    """
+    expires_in = settings.PROFILING_TOKEN_TTL_SECONDS
+    token = jwt.encode(
+        {"scope": PROFILE_TOKEN_SCOPE, "issued_by": user_id,
+         "exp": datetime.utcnow() + timedelta(seconds=expires_in)},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+    return {"token": token, "expires_in": expires_in}
+
+
+def verify_profile_token(token: str) -> bool:
+    """Whether a token is an unexpired profiling token issued by this deployment."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("scope") == PROFILE_TOKEN_SCOPE
+
+
+# Global profilers (one run of each kind at a time per process)
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
+request_profiler = RequestProfiler()
@@ -1,16 +1,50 @@
 """
 Security utilities for password hashing and JWT token management.
 """
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
-
-
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.metrics import registry
+
+
+# Password hashing context using bcrypt.
+# min/max rounds pin the cost: hashes made with any other cost are flagged
+# for update and transparently rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Bounded worker pool for bcrypt. bcrypt releases the GIL, so threads run in
+# parallel while the event loop keeps serving WebSockets.
+# The pool size is the concurrency limit; extra jobs wait in its queue.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
+password_hash_wait_seconds = registry.histogram(
+    "password_hash_queue_wait_seconds", "Time password hashing jobs wait for a worker", ["operation"]
+)
+password_hash_duration_seconds = registry.histogram(
+    "password_hash_duration_seconds", "Time spent running bcrypt", ["operation"]
+)
+password_hash_inflight = registry.gauge(
+    "password_hash_inflight", "Password hashing jobs submitted and not yet finished"
+)
+password_hash_queued = registry.gauge(
+    "password_hash_queued", "Password hashing jobs waiting for a free worker",
+    collect=lambda gauge: gauge.set(_hash_executor._work_queue.qsize()),
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -40,6 +74,71 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _timed(func, *args):
+    """Run func in a worker thread and report when it actually started."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, started, time.perf_counter()
+
+
+async def _run_in_hash_pool(operation: str, func, *args):
+    """
+    Run a bcrypt operation in the password hashing pool and record metrics.
+
+    Args:
+        operation: Metric label ("hash", "verify")
+        func: Blocking function to run
+        *args: Arguments for func
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    password_hash_inflight.inc()
+    try:
+        result, started, finished = await loop.run_in_executor(_hash_executor, _timed, func, *args)
+    finally:
+        password_hash_inflight.dec()
+
+    password_hash_wait_seconds.labels(operation).observe(started - submitted)
+    password_hash_duration_seconds.labels(operation).observe(finished - started)
+    return result
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop.
+
+    Args:
+        password: Plain text password to hash
+
+    Returns:
+        Bcrypt hashed password string
+    """
+    return await _run_in_hash_pool("hash", pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop.
+    If the stored hash uses an outdated cost, a replacement hash is returned.
+
+    Args:
+        plain_password: The plain text password from user input
+        hashed_password: The bcrypt hashed password from database
+
+    Returns:
+        Tuple of (password matches, new hash to store or None)
+    """
+    return await _run_in_hash_pool("verify", pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_password_hashing():
+    """Stop the password hashing workers (called on application shutdown)."""
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -0,0 +1,43 @@
+"""
+Fast JSON encoding for list endpoints.
+
+List pages are selected as plain column rows (no ORM instances) and encoded
+with orjson, skipping Pydantic validation. The output is byte-for-byte
+compatible with the response schemas: the same keys in the same order, and
+UTC datetimes rendered with a "Z" suffix as Pydantic does.
+"""
+from typing import Iterable, List, Mapping, Type
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import Column
+
+# Pydantic renders UTC offsets as "Z"; orjson needs to be told to
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List[Column]:
+    """
+    Table columns for a response schema's fields, in schema field order.
+
+    Args:
+        model: ORM model class the rows come from
+        schema: Response schema whose fields are all columns of the model
+    """
+    table = model.__table__
+    return [table.c[name] for name in schema.model_fields]
+
+
+def dumps(content) -> bytes:
+    """Encode JSON-compatible content with orjson."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def dumps_rows(rows: Iterable[Mapping]) -> bytes:
+    """
+    Encode result rows (e.g. `result.mappings()`) as a JSON array of objects.
+
+    Args:
+        rows: Row mappings selected with schema_columns()
+    """
+    return orjson.dumps([dict(row) for row in rows], option=ORJSON_OPTIONS)
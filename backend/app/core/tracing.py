@@ -0,0 +1,130 @@
+"""
+Sampled end-to-end latency tracing for room events.
+
+A traced event carries a small "_trace" object through the pipeline:
+
+    receive (WebSocket) -> publish (broker) -> delivery (broker listener) -> send complete (fan-out)
+
+Stages on the same node are timed with the monotonic clock. Stages that can
+cross nodes (publish -> delivery, and the end-to-end total) use wall-clock
+stamps, because monotonic clocks aren't comparable between processes. Those
+two include any clock skew between nodes.
+
+Events are sampled at TRACE_SAMPLE_RATE. A client can force tracing of an
+event by sending a "trace_id". Trace IDs are echoed to clients as "trace_id"
+when TRACE_ECHO_TO_CLIENTS is on or the client supplied the ID; the internal
+"_trace" object is never sent to clients.
+"""
+import random
+import time
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+TRACE_FIELD = "_trace"
+CLIENT_TRACE_FIELD = "trace_id"
+_MAX_TRACE_ID_LENGTH = 64
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+event_stage_seconds = registry.histogram(
+    "event_stage_seconds",
+    "Per-stage latency of traced room events "
+    "(receive_to_publish, publish_to_delivery, delivery_to_send, end_to_end)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+traced_events_total = registry.counter(
+    "traced_events_total", "Room events selected for latency tracing", ["source"]
+)
+
+
+def start_trace(message: dict, received_at: float) -> Optional[dict]:
+    """
+    Decide whether to trace an event received from a client, and start its trace.
+    Removes any client-supplied trace_id and "_trace" object from the message.
+
+    Args:
+        message: The event being handled (mutated)
+        received_at: Wall-clock time the frame was received
+
+    Returns:
+        The trace object (also stored in the message), or None if not traced
+    """
+    # Only the server writes "_trace"; a client-supplied one is never trusted
+    message.pop(TRACE_FIELD, None)
+    client_trace_id = message.pop(CLIENT_TRACE_FIELD, None)
+    if isinstance(client_trace_id, str) and 0 < len(client_trace_id) <= _MAX_TRACE_ID_LENGTH:
+        traced_events_total.labels("client").inc()
+        trace = {"id": client_trace_id, "echo": True}
+    elif settings.TRACE_SAMPLE_RATE > 0 and random.random() < settings.TRACE_SAMPLE_RATE:
+        traced_events_total.labels("sampled").inc()
+        trace = {"id": uuid.uuid4().hex[:16], "echo": settings.TRACE_ECHO_TO_CLIENTS}
+    else:
+        return None
+
+    trace["received_at"] = received_at
+    message[TRACE_FIELD] = trace
+    return trace
+
+
+def _stamp(value) -> Optional[float]:
+    """A trace timestamp, or None if missing or malformed (events can come from other nodes)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def mark_published(trace: dict, received_monotonic: float):
+    """Stamp the moment an event is handed to the broker."""
+    trace["published_at"] = time.time()
+    event_stage_seconds.labels("receive_to_publish").observe(time.perf_counter() - received_monotonic)
+
+
+def mark_delivered(message: dict) -> Optional[dict]:
+    """
+    Stamp Redis delivery on this node for a traced event.
+
+    Returns:
+        A node-local copy of the trace (with a monotonic delivery stamp), or None
+    """
+    trace = message.get(TRACE_FIELD)
+    if not isinstance(trace, dict):
+        return None
+
+    local = dict(trace, delivered_monotonic=time.perf_counter())
+    published_at = _stamp(trace.get("published_at"))
+    if published_at is not None:
+        event_stage_seconds.labels("publish_to_delivery").observe(max(0.0, time.time() - published_at))
+    message[TRACE_FIELD] = local
+    return local
+
+
+def client_payload(message: dict) -> dict:
+    """
+    The event as clients should see it: without the internal trace object,
+    with "trace_id" echoed when enabled for this trace.
+    """
+    if TRACE_FIELD not in message:
+        return message
+
+    trace = message[TRACE_FIELD]
+    payload = {key: value for key, value in message.items() if key != TRACE_FIELD}
+    if isinstance(trace, dict) and trace.get("echo") and isinstance(trace.get("id"), str):
+        payload[CLIENT_TRACE_FIELD] = trace["id"]
+    return payload
+
+
+def mark_sent(trace: Optional[dict]):
+    """Stamp local fan-out completion and record the remaining stages."""
+    if not isinstance(trace, dict):
+        return
+    delivered_monotonic = _stamp(trace.get("delivered_monotonic"))
+    if delivered_monotonic is None:
+        return
+    event_stage_seconds.labels("delivery_to_send").observe(time.perf_counter() - delivered_monotonic)
+    received_at = _stamp(trace.get("received_at"))
+    if received_at is not None:
+        event_stage_seconds.labels("end_to_end").observe(max(0.0, time.time() - received_at))
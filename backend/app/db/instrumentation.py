@@ -0,0 +1,127 @@
+"""
+Per-request database query accounting.
+
+Engine event hooks add every statement's count and duration to the QueryStats
+of the current unit of work (an HTTP request or a WebSocket event), tracked in
+a context variable. Finished units are reported as histograms, and a warning
+is logged when one unit issues more than DB_QUERY_WARN_THRESHOLD queries,
+which usually means an N+1 pattern or a redundant lookup.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 20, 50, 100)
+
+queries_per_operation = registry.histogram(
+    "db_queries_per_operation", "Database queries issued per request or WebSocket event",
+    ["operation"], buckets=QUERY_COUNT_BUCKETS,
+)
+query_time_per_operation_seconds = registry.histogram(
+    "db_query_time_per_operation_seconds", "Total database time per request or WebSocket event", ["operation"]
+)
+query_budget_exceeded_total = registry.counter(
+    "db_query_budget_exceeded_total", "Requests or WebSocket events over DB_QUERY_WARN_THRESHOLD queries", ["operation"]
+)
+
+
+class QueryStats:
+    """
+    Queries issued by one unit of work.
+
+    Attributes:
+        operation: Label for the unit of work (e.g. "GET /api/rooms/{room_id}")
+        count: Number of statements executed
+        total_seconds: Sum of statement durations
+        slowest_seconds: Duration of the slowest statement
+        slowest_statement: SQL of the slowest statement
+    """
+    __slots__ = ("operation", "count", "total_seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self, operation: Optional[str] = None):
+        self.operation = operation
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed >= self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """QueryStats of the unit of work running in this context, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(operation: Optional[str] = None) -> Iterator[QueryStats]:
+    """
+    Count queries issued inside the block and report them when it exits.
+    The operation label may be filled in later (e.g. once the route is known).
+
+    Args:
+        operation: Label for the unit of work
+    """
+    stats = QueryStats(operation)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        report_query_stats(stats)
+
+
+def report_query_stats(stats: QueryStats):
+    """Record a finished unit of work in metrics and warn if it exceeded the query budget."""
+    operation = stats.operation or "unknown"
+    queries_per_operation.labels(operation).observe(stats.count)
+    query_time_per_operation_seconds.labels(operation).observe(stats.total_seconds)
+
+    threshold = settings.DB_QUERY_WARN_THRESHOLD
+    if threshold and stats.count > threshold:
+        query_budget_exceeded_total.labels(operation).inc()
+        slowest = " ".join((stats.slowest_statement or "").split())[:200]
+        logger.warning(
+            f"{operation} issued {stats.count} queries (threshold {threshold}) "
+            f"in {stats.total_seconds * 1000:.1f} ms; slowest {stats.slowest_seconds * 1000:.1f} ms: {slowest}"
+        )
+
+
+def instrument_engine(db_engine: AsyncEngine):
+    """Attach query timing hooks to an engine."""
+
+    @event.listens_for(db_engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(db_engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+    @event.listens_for(db_engine.sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # Failed statements never reach after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
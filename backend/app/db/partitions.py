@@ -0,0 +1,301 @@
+"""
+Monthly range partitions for the messages table.
+
+Partitions are named messages_pYYYYMM and hold rows whose created_at falls in
+[first of month, first of next month) UTC. Rows outside every partition land
+in messages_default. The partitioned table itself is created by the Alembic
+migration 0003_partition_messages.
+
+Maintenance commands (run from the backend directory, e.g. from cron):
+    python -m app.db.partitions list
+    python -m app.db.partitions ensure [--months-ahead 3]
+    python -m app.db.partitions archive [--retention-months 12] [--archive-dir DIR]
+    python -m app.db.partitions restore FILE
+
+`archive` detaches partitions older than the retention horizon, exports them
+to gzip-compressed NDJSON (plus a manifest) and drops them.
+`restore` re-creates the month's partition and re-imports an archive file.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "messages"
+DEFAULT_PARTITION = "messages_default"
+COLUMNS = ("id", "room_id", "user_id", "content", "created_at")
+_PARTITION_RE = re.compile(r"^messages_p(\d{4})(\d{2})$")
+_RESTORE_BATCH_SIZE = 1000
+
+
+def month_start(value: datetime) -> date:
+    """First day of the (UTC) month containing value."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """Shift a first-of-month date by count months (may be negative)."""
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    """Month covered by a partition name, or None if it isn't a monthly partition."""
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+async def list_partitions(conn: AsyncConnection) -> List[str]:
+    """Names of partitions currently attached to the messages table."""
+    result = await conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+        ORDER BY child.relname
+    """), {"parent": PARENT_TABLE})
+    return [row[0] for row in result]
+
+
+async def _list_detached(conn: AsyncConnection) -> List[str]:
+    """Monthly tables left detached by an interrupted archive run."""
+    result = await conn.execute(text("""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND NOT relispartition AND relname ~ '^messages_p[0-9]{6}$'
+        ORDER BY relname
+    """))
+    return [row[0] for row in result]
+
+
+async def ensure_partition(conn: AsyncConnection, month: date) -> bool:
+    """
+    Create and attach the partition for a month if it doesn't exist.
+    Rows for that month already sitting in the default partition are moved in.
+
+    Returns:
+        True if a partition was created
+    """
+    name = partition_name(month)
+    exists = (await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar()
+    if exists:
+        return False
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    columns = ", ".join(COLUMNS)
+    in_range = f"created_at >= {start} AND created_at < {end}"
+
+    await conn.exec_driver_sql(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)"
+    )
+    await conn.exec_driver_sql(
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {in_range}"
+    )
+    await conn.exec_driver_sql(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}")
+    await conn.exec_driver_sql(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})"
+    )
+    logger.info(f"Created partition {name}")
+    return True
+
+
+async def ensure_partitions(months_ahead: int) -> List[str]:
+    """
+    Make sure partitions exist from the current month to months_ahead months out.
+
+    Returns:
+        Names of partitions that were created
+    """
+    current = month_start(datetime.now(timezone.utc))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        async with engine.begin() as conn:
+            if await ensure_partition(conn, month):
+                created.append(partition_name(month))
+    return created
+
+
+async def _export_table(conn: AsyncConnection, name: str, archive_dir: str) -> dict:
+    """Stream a detached partition into <archive_dir>/<name>.ndjson.gz and write its manifest."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.ndjson.gz")
+    tmp_path = f"{path}.tmp"
+
+    rows = 0
+    result = await conn.stream(text(f"SELECT {', '.join(COLUMNS)} FROM {name} ORDER BY id"))
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as archive:
+        async for row in result.mappings():
+            record = dict(row)
+            record["created_at"] = record["created_at"].isoformat()
+            archive.write(json.dumps(record, ensure_ascii=False))
+            archive.write("\n")
+            rows += 1
+        archive.flush()
+        os.fsync(archive.fileno())
+    os.replace(tmp_path, path)
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as archive:
+        for chunk in iter(lambda: archive.read(1 << 20), b""):
+            sha256.update(chunk)
+
+    month = parse_partition_name(name)
+    manifest = {
+        "table": PARENT_TABLE,
+        "partition": name,
+        "month": month.strftime("%Y-%m"),
+        "rows": rows,
+        "file": os.path.basename(path),
+        "sha256": sha256.hexdigest(),
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(archive_dir, f"{name}.manifest.json"), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+async def archive_partitions(retention_months: int, archive_dir: str) -> List[dict]:
+    """
+    Detach, export and drop partitions entirely older than the retention horizon.
+    Each partition is handled on its own; a partition left detached by a failed
+    run is picked up again on the next run.
+
+    Returns:
+        Manifests of archived partitions
+    """
+    horizon = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+
+    async with engine.connect() as conn:
+        attached = await list_partitions(conn)
+        detached = await _list_detached(conn)
+
+    expired = [
+        name for name in attached
+        if parse_partition_name(name) and add_months(parse_partition_name(name), 1) <= horizon
+    ]
+
+    for name in expired:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+        logger.info(f"Detached partition {name}")
+
+    manifests = []
+    for name in sorted(set(expired) | set(detached)):
+        async with engine.begin() as conn:
+            manifest = await _export_table(conn, name, archive_dir)
+            await conn.exec_driver_sql(f"DROP TABLE {name}")
+        logger.info(f"Archived {manifest['rows']} rows from {name} to {manifest['file']}")
+        manifests.append(manifest)
+    return manifests
+
+
+async def restore_archive(path: str) -> int:
+    """
+    Re-import an archived partition file.
+    Rows whose room or user no longer exists, or that are already present, are skipped.
+
+    Returns:
+        Number of rows inserted
+    """
+    name = os.path.basename(path).split(".", 1)[0]
+    month = parse_partition_name(name)
+    if month is None:
+        raise ValueError(f"Not a message partition archive: {path}")
+
+    insert_sql = text(f"""
+        INSERT INTO {PARENT_TABLE} ({', '.join(COLUMNS)})
+        SELECT r.id, r.room_id, r.user_id, r.content, r.created_at
+        FROM jsonb_to_recordset(CAST(:rows AS jsonb))
+            AS r(id integer, room_id integer, user_id integer, content text, created_at timestamptz)
+        WHERE EXISTS (SELECT 1 FROM rooms WHERE rooms.id = r.room_id)
+          AND EXISTS (SELECT 1 FROM users WHERE users.id = r.user_id)
+        ON CONFLICT DO NOTHING
+    """)
+
+    inserted = 0
+    async with engine.begin() as conn:
+        await ensure_partition(conn, month)
+
+        batch = []
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                batch.append(line)
+                if len(batch) >= _RESTORE_BATCH_SIZE:
+                    inserted += (await conn.execute(insert_sql, {"rows": f"[{','.join(batch)}]"})).rowcount
+                    batch = []
+        if batch:
+            inserted += (await conn.execute(insert_sql, {"rows": f"[{','.join(batch)}]"})).rowcount
+
+    logger.info(f"Restored {inserted} rows into {name}")
+    return inserted
+
+
+async def _run(args) -> None:
+    try:
+        if args.command == "list":
+            async with engine.connect() as conn:
+                for name in await list_partitions(conn):
+                    print(name)
+        elif args.command == "ensure":
+            created = await ensure_partitions(args.months_ahead)
+            print(f"Created {len(created)} partition(s): {', '.join(created) or '-'}")
+        elif args.command == "archive":
+            manifests = await archive_partitions(args.retention_months, args.archive_dir)
+            for manifest in manifests:
+                print(f"{manifest['partition']}: {manifest['rows']} rows -> {manifest['file']}")
+            print(f"Archived {len(manifests)} partition(s)")
+        elif args.command == "restore":
+            print(f"Restored {await restore_archive(args.file)} row(s)")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.db.partitions", description="Message partition maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List attached partitions")
+
+    ensure = commands.add_parser("ensure", help="Create upcoming monthly partitions")
+    ensure.add_argument("--months-ahead", type=int, default=settings.MESSAGE_PARTITION_MONTHS_AHEAD)
+
+    archive = commands.add_parser("archive", help="Detach and export partitions past retention")
+    archive.add_argument("--retention-months", type=int, default=settings.MESSAGE_RETENTION_MONTHS)
+    archive.add_argument("--archive-dir", default=settings.MESSAGE_ARCHIVE_DIR)
+
+    restore = commands.add_parser("restore", help="Re-import an archived partition")
+    restore.add_argument("file", help="Path to a messages_pYYYYMM.ndjson.gz archive")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,30 +2,160 @@
 Database session management with async SQLAlchemy.
 Connects to NeonDB PostgreSQL using connection pooling.
 """
+import asyncio
+import logging
 import re
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import registry
+from app.db.instrumentation import instrument_engine
 
+logger = logging.getLogger(__name__)
 
-# Convert postgresql:// to postgresql+asyncpg:// for async support (Neon official pattern)
-async_database_url = re.sub(r'^postgresql:', 'postgresql+asyncpg:', settings.DATABASE_URL)
 
-# Remove sslmode and channel_binding from URL (asyncpg doesn't support these query params)
-# asyncpg uses ssl=True by default for URLs with sslmode=require
-async_database_url = re.sub(r'[?&]sslmode=[^&]*', '', async_database_url)
-async_database_url = re.sub(r'[?&]channel_binding=[^&]*', '', async_database_url)
+# Connection pool metrics (labelled by engine: "primary" or "replica")
+pool_checkouts_total = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool", ["engine"]
+)
+pool_checkout_timeouts_total = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a free connection", ["engine"]
+)
+pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["engine"]
+)
+pool_connections_created_total = registry.counter(
+    "db_pool_connections_created_total", "New database connections opened by the pool", ["engine"]
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long callers wait for a connection.
+    The wait includes opening a new connection when the pool grows into overflow.
+    The pool's logging name ("primary"/"replica") is used as the metric label.
+    """
+
+    def connect(self):
+        label = self.logging_name or "primary"
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_checkout_timeouts_total.labels(label).inc()
+            raise
+        finally:
+            pool_checkout_wait_seconds.labels(label).observe(time.perf_counter() - start)
+        pool_checkouts_total.labels(label).inc()
+        return connection
+
+
+def _to_async_url(url: str) -> str:
+    """
+    Convert a Postgres URL into an asyncpg URL.
+
+    Args:
+        url: Database URL as configured (e.g. copied from the Neon console)
+
+    Returns:
+        URL usable by create_async_engine
+    """
+    # Convert postgresql:// to postgresql+asyncpg:// for async support (Neon official pattern)
+    url = re.sub(r'^postgresql:', 'postgresql+asyncpg:', url)
+
+    # Remove sslmode and channel_binding from URL (asyncpg doesn't support these query params)
+    # asyncpg uses ssl=True by default for URLs with sslmode=require
+    url = re.sub(r'[?&]sslmode=[^&]*', '', url)
+    url = re.sub(r'[?&]channel_binding=[^&]*', '', url)
+    return url
+
+
+def to_asyncpg_dsn(url: str) -> str:
+    """
+    Convert a Postgres URL into a DSN for raw asyncpg connections
+    (used outside SQLAlchemy, e.g. by the LISTEN/NOTIFY broker).
+    """
+    return _to_async_url(url).replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    """Create an async engine with connection pooling and pool metrics."""
+    async_url = _to_async_url(url)
+    # SSL required for Neon; other drivers (e.g. aiosqlite in load tests) take no ssl argument
+    connect_args = {"ssl": settings.DB_SSL} if async_url.startswith("postgresql+asyncpg") else {}
+    db_engine = create_async_engine(
+        async_url,
+        echo=settings.DB_ECHO,  # Log every SQL statement
+        future=True,
+        pool_pre_ping=True,  # Verify connections before using
+        poolclass=InstrumentedAsyncQueuePool,  # Records checkout wait times
+        pool_logging_name=name,  # Metric label
+        pool_size=settings.DB_POOL_SIZE,  # Connection pool size
+        max_overflow=settings.DB_MAX_OVERFLOW,  # Allow extra connections when pool is full
+        pool_timeout=settings.DB_POOL_TIMEOUT,  # Seconds to wait before giving up on checkout
+        connect_args=connect_args
+    )
+
+    @event.listens_for(db_engine.sync_engine, "connect")
+    def _on_pool_connect(dbapi_connection, connection_record):
+        pool_connections_created_total.labels(name).inc()
+
+    # Per-request query counts and timings
+    instrument_engine(db_engine)
+
+    return db_engine
+
 
-# Create async engine with connection pooling
-engine = create_async_engine(
-    async_database_url,
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-    future=True,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,  # Connection pool size
-    max_overflow=20,  # Allow extra connections when pool is full
-    connect_args={"ssl": "require"}  # SSL required for Neon
+# Primary (read-write) engine
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# Optional read replica engine for list/detail GET endpoints
+read_engine: Optional[AsyncEngine] = (
+    _create_engine(settings.DATABASE_READ_URL, "replica") if settings.DATABASE_READ_URL else None
+)
+
+
+def get_pool_stats(db_engine: Optional[AsyncEngine] = None) -> dict:
+    """
+    Current connection pool occupancy.
+
+    Args:
+        db_engine: Engine to inspect (defaults to the primary engine)
+
+    Returns:
+        Dictionary with pool size, checked-out/idle connections and overflow in use
+    """
+    pool = (db_engine or engine).pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+
+def _collect_pool_gauges(gauge):
+    engines = {"primary": engine, "replica": read_engine}
+    for name, db_engine in engines.items():
+        if db_engine is None:
+            continue
+        stats = get_pool_stats(db_engine)
+        for key in ("size", "checked_out", "checked_in", "overflow"):
+            gauge.labels(name, key).set(stats[key])
+
+
+pool_connections = registry.gauge(
+    "db_pool_connections", "Connection pool occupancy by state", ["engine", "state"],
+    collect=_collect_pool_gauges,
 )
 
 # Session factory for creating database sessions
@@ -37,14 +167,134 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Session factory for the read replica (falls back to the primary when not configured)
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine or engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 # Base class for all ORM models
 Base = declarative_base()
 
 
-async def get_db() -> AsyncSession:
+db_read_routing_total = registry.counter(
+    "db_read_routing_total", "Read sessions handed out, by target and reason", ["target", "reason"]
+)
+db_replica_lag_seconds = registry.gauge(
+    "db_replica_lag_seconds", "Last measured read replica replay lag"
+)
+
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read may go to the replica.
+
+    Reads fall back to the primary when:
+    - no replica is configured
+    - the replica is unreachable or lags more than READ_REPLICA_MAX_LAG_SECONDS
+    - the same client wrote within READ_YOUR_WRITES_WINDOW_SECONDS (read-your-writes)
+
+    Recent writers are tracked per node, keyed by the client's bearer token.
+    """
+
+    def __init__(self):
+        self.replica_healthy: bool = read_engine is not None
+        self.lag_seconds: Optional[float] = None
+        self._recent_writers = TTLCache(maxsize=100_000, ttl=settings.READ_YOUR_WRITES_WINDOW_SECONDS)
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    def mark_write(self, client_key: str):
+        """Pin a client's reads to the primary for the read-your-writes window."""
+        self._recent_writers.set(client_key, True)
+
+    def choose(self, client_key: Optional[str]) -> str:
+        """
+        Pick the target for a read session.
+
+        Args:
+            client_key: Identifies the caller (bearer token), if any
+
+        Returns:
+            Reason string; "replica" means the replica may be used
+        """
+        if read_engine is None:
+            return "no_replica"
+        if not self.replica_healthy:
+            return "replica_unhealthy"
+        if client_key and client_key in self._recent_writers:
+            return "recent_write"
+        return "replica"
+
+    async def start(self):
+        """Start polling replica lag (no-op without a replica)."""
+        if read_engine is not None and self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+
+    async def _monitor(self):
+        while True:
+            try:
+                async with read_engine.connect() as conn:
+                    lag = float((await conn.execute(_REPLICA_LAG_SQL)).scalar() or 0)
+                self.lag_seconds = lag
+                db_replica_lag_seconds.set(lag)
+                healthy = lag <= settings.READ_REPLICA_MAX_LAG_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Read replica health check failed: {e}")
+                healthy = False
+
+            if healthy != self.replica_healthy:
+                logger.warning(f"Read replica {'healthy' if healthy else 'unhealthy'} (lag={self.lag_seconds}s)")
+            self.replica_healthy = healthy
+            await asyncio.sleep(settings.READ_REPLICA_CHECK_INTERVAL_SECONDS)
+
+
+# Global replica router instance
+replica_router = ReplicaRouter()
+
+
+def _client_key(request: Optional[Request]) -> Optional[str]:
+    """Identify the caller for read-your-writes tracking."""
+    if request is None:
+        return None
+    return request.headers.get("authorization")
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_client_write(session, flush_context):
+    """Pin the writing client to the primary as soon as its writes are flushed."""
+    client_key = session.info.get("client_key")
+    if client_key:
+        replica_router.mark_write(client_key)
+
+
+async def get_db(request: Request = None) -> AsyncSession:
     """
     Dependency for FastAPI endpoints to get a database session.
     Automatically commits on success, rolls back on error, and closes the session.
+    Writes made through this session pin the client's reads to the primary
+    for READ_YOUR_WRITES_WINDOW_SECONDS.
 
     Usage in FastAPI:
         @app.get("/users")
@@ -53,6 +303,7 @@ async def get_db() -> AsyncSession:
             return result.scalars().all()
     """
     async with AsyncSessionLocal() as session:
+        session.info["client_key"] = _client_key(request)
         try:
             yield session
             await session.commit()
@@ -63,11 +314,109 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db(request: Request = None) -> AsyncSession:
+    """
+    Dependency for read-only endpoints.
+    Uses the read replica when it is configured, healthy and the caller has
+    not written recently; otherwise uses the primary.
+
+    Usage in FastAPI:
+        @app.get("/rooms")
+        async def list_rooms(db: AsyncSession = Depends(get_read_db)):
+            ...
+    """
+    reason = replica_router.choose(_client_key(request))
+    use_replica = reason == "replica"
+    db_read_routing_total.labels("replica" if use_replica else "primary", reason).inc()
+
+    session_factory = AsyncReadSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+
+@asynccontextmanager
+async def session_scope():
+    """
+    Short-lived session for code outside the request/response cycle (e.g. WebSockets).
+    The pooled connection is returned as soon as the block exits, so long-lived
+    callers don't pin a connection for their whole lifetime.
+
+    Usage:
+        async with session_scope() as db:
+            user = await get_user_by_email(db, email)
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+@asynccontextmanager
+async def read_session_scope():
+    """
+    Short-lived read session not tied to any one request, e.g. for a cache
+    load that several requests share. Routed like get_read_db for an
+    anonymous caller (replica when configured and healthy).
+
+    Usage:
+        async with read_session_scope() as db:
+            page = await get_message_page(db, room_id)
+    """
+    reason = replica_router.choose(None)
+    use_replica = reason == "replica"
+    db_read_routing_total.labels("replica" if use_replica else "primary", reason).inc()
+
+    session_factory = AsyncReadSessionLocal if use_replica else AsyncSessionLocal
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+
 async def init_db():
     """
     Initialize database tables.
     This creates all tables defined in models.
-    For production, use Alembic migrations instead.
+    Only used when DB_AUTO_CREATE is enabled (throwaway dev/test databases);
+    real databases are managed with Alembic (`alembic upgrade head`).
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+async def prewarm_pool(count: int) -> int:
+    """
+    Open `count` pooled connections up front so the first requests after
+    startup don't pay for TCP/TLS setup.
+
+    Args:
+        count: Number of connections to open (capped at the pool size)
+
+    Returns:
+        Number of connections successfully opened
+    """
+    count = min(count, settings.DB_POOL_SIZE)
+    if count <= 0:
+        return 0
+
+    async def _open():
+        conn = engine.connect()
+        await conn.start()
+        return conn
+
+    # Hold all connections at once, otherwise the pool would hand back the same one
+    results = await asyncio.gather(*(_open() for _ in range(count)), return_exceptions=True)
+    connections = [result for result in results if not isinstance(result, BaseException)]
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning(f"Pool pre-warm connection failed: {result}")
+
+    await asyncio.gather(*(conn.close() for conn in connections))
+    return len(connections)
@@ -1,9 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import time
 
 from app.core.config import settings
+from app.middleware import CompressionMiddleware, HTTPMetricsMiddleware, ProfilingMiddleware, QueryStatsMiddleware
+from app.core.metrics import registry, PROMETHEUS_CONTENT_TYPE
+from app.core.logging_config import configure_logging
+
+configure_logging()
 
 # Application startup/shutdown lifecycle
 @asynccontextmanager
@@ -14,28 +20,69 @@ async def lifespan(app: FastAPI):
     print(f"🚀 {settings.APP_NAME} starting up...")
     print(f"📊 Debug mode: {settings.DEBUG}")
 
-    # Initialize database
-    from app.db.session import init_db, engine
-    print("📊 Initializing database...")
-    await init_db()
-    print("✅ Database initialized")
-
-    # Initialize Redis connection
-    from app.websocket.redis_pubsub import redis_manager
-    print("📊 Initializing Redis connection...")
-    await redis_manager.connect()
-    print("✅ Redis connected")
+    # Schema is owned by Alembic migrations; create_all only for throwaway dev databases
+    from app.db.session import init_db, prewarm_pool, engine, read_engine, replica_router
+    if settings.DB_AUTO_CREATE:
+        print("📊 Initializing database...")
+        await init_db()
+        print("✅ Database initialized")
+
+    # Open pooled connections up front
+    if settings.DB_POOL_PREWARM > 0:
+        opened = await prewarm_pool(settings.DB_POOL_PREWARM)
+        print(f"✅ Pre-warmed {opened} database connection(s)")
+
+    # Start read replica lag monitoring (no-op without DATABASE_READ_URL)
+    await replica_router.start()
+
+    # Connect the room event broker (see BROKER_BACKEND)
+    from app.websocket import broker
+    print(f"📊 Connecting {broker.name} broker...")
+    await broker.connect()
+    print(f"✅ {broker.name.capitalize()} broker connected")
+
+    from app.services.user_cache import user_cache
+    from app.services.room_cache import room_cache
+    if broker.redis_client is not None:
+        # Listen for cross-node user cache invalidations
+        await user_cache.start(broker.redis_client)
+
+        # Share room listing cache entries and invalidations across nodes
+        await room_cache.start(broker.redis_client)
+    elif broker.name != "memory":
+        # Without Redis other nodes never hear about writes, so cached listings
+        # and users (deactivations, credential changes) would go stale
+        user_cache.enabled = False
+        print("⚠️ User cache disabled: cross-node invalidation needs Redis")
+        if room_cache.enabled:
+            room_cache.enabled = False
+            print("⚠️ Room cache disabled: cross-node invalidation needs Redis")
+
+    # Measure event-loop lag (and report blocking callbacks when enabled)
+    from app.core.loop_monitor import loop_monitor
+    await loop_monitor.start()
 
     yield
 
     # Shutdown
     print(f"🛑 {settings.APP_NAME} shutting down...")
 
-    # Close Redis connections
-    await redis_manager.disconnect()
-    print("✅ Redis connections closed")
+    await loop_monitor.stop()
+
+    # Close broker (and Redis) connections
+    await user_cache.stop()
+    await room_cache.stop()
+    await broker.disconnect()
+    print("✅ Broker connections closed")
+
+    # Stop password hashing workers
+    from app.core.security import shutdown_password_hashing
+    shutdown_password_hashing()
 
     # Close database connections
+    await replica_router.stop()
+    if read_engine is not None:
+        await read_engine.dispose()
     await engine.dispose()
     print("✅ Database connections closed")
 
@@ -56,6 +103,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# cProfile for requests sending an X-Profile token (inside compression and metrics)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-request query counts/timings (as response headers in debug mode)
+app.add_middleware(QueryStatsMiddleware, expose_headers=settings.DEBUG)
+
+# gzip/Brotli for larger HTTP responses (WebSocket traffic is untouched)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_enabled=settings.COMPRESSION_BROTLI_ENABLED,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Request latency per route (outermost, so it includes compression)
+app.add_middleware(HTTPMetricsMiddleware)
+
 #health check endpoint
 @app.get("/")
 async def root():
@@ -75,30 +141,47 @@ async def health_check():
     }
 
 
-# Metrics endpoint (basic version - will expand later)
+process_uptime_seconds = registry.gauge(
+    "process_uptime_seconds", "Seconds since this worker started",
+    collect=lambda gauge: gauge.set(time.time() - getattr(app.state, "start_time", time.time())),
+)
+
+
+# Metrics endpoint
 @app.get("/metrics")
-async def metrics():
+async def metrics(format: str = Query("prometheus", pattern="^(prometheus|json)$")):
     """
-      Prometheus-style metrics endpoint.
-      Shows active connections, uptime, and message counts.
+    Prometheus metrics for this worker (text exposition format).
+    Use ?format=json for a human-readable snapshot including pool and replica state.
     """
+    if format == "prometheus":
+        return PlainTextResponse(registry.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    from app.db.session import get_pool_stats, read_engine, replica_router
+
     uptime = time.time() - app.state.start_time
     return {
         "uptime_seconds": round(uptime, 2),
-        "active_websocket_connections": 0,  # TODO: Track from ConnectionManager
-        "total_messages_sent": 0,  # TODO: Track from Redis/DB
-        "total_rooms": 0,  # TODO: Query from DB
+        "db_pool": get_pool_stats(),
+        "db_replica": {
+            "pool": get_pool_stats(read_engine) if read_engine is not None else None,
+            "healthy": replica_router.replica_healthy,
+            "lag_seconds": replica_router.lag_seconds,
+        },
+        "metrics": registry.snapshot(),
     }
 
 
 # Include API routers
-from app.api import auth, rooms, messages, notes, websocket
+from app.api import admin, auth, rooms, messages, notes, search, websocket
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(rooms.router, prefix="/api/rooms", tags=["Rooms"])
 app.include_router(messages.router, prefix="/api", tags=["Messages"])
 app.include_router(notes.router, prefix="/api", tags=["Notes"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
 app.include_router(websocket.router, tags=["WebSocket"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 # TODO: Add more API routers
 # app.include_router(messages_router, prefix="/api/messages", tags=["Messages"])
@@ -0,0 +1,9 @@
+"""
+ASGI middleware.
+"""
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.http_metrics import HTTPMetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+
+__all__ = ["CompressionMiddleware", "HTTPMetricsMiddleware", "ProfilingMiddleware", "QueryStatsMiddleware"]
@@ -0,0 +1,224 @@
+"""
+Response compression (gzip, and Brotli when the brotli package is installed).
+"""
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+)
+
+RATIO_BUCKETS = (1.0, 1.25, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 16.0, 32.0)
+
+compressed_responses_total = registry.counter(
+    "http_compressed_responses_total", "HTTP responses sent compressed", ["encoding"]
+)
+uncompressed_responses_total = registry.counter(
+    "http_uncompressed_responses_total", "HTTP responses sent uncompressed, by reason", ["reason"]
+)
+compression_bytes_in_total = registry.counter(
+    "http_compression_bytes_in_total", "Response bytes before compression", ["encoding"]
+)
+compression_bytes_out_total = registry.counter(
+    "http_compression_bytes_out_total", "Response bytes after compression", ["encoding"]
+)
+compression_ratio = registry.histogram(
+    "http_compression_ratio", "Uncompressed / compressed size per response", ["encoding"], buckets=RATIO_BUCKETS
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    """Codings the client accepts (q > 0), lower-cased."""
+    accepted = []
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.append(coding.strip().lower())
+    return accepted
+
+
+class _Compressor:
+    """Streaming compressor for one response."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        self.bytes_in += len(data)
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            if final:
+                out += self._compressor.finish()
+        else:
+            out = self._compressor.compress(data)
+            out += self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.bytes_out += len(out)
+        return out
+
+
+class CompressionMiddleware:
+    """
+    Compresses HTTP responses of compressible content types once their body
+    reaches minimum_size bytes. Brotli is preferred when enabled, installed and
+    accepted by the client; otherwise gzip. WebSocket traffic, already-encoded
+    responses and bodiless statuses pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_enabled: bool = True,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_enabled = brotli_enabled and brotli is not None
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if self.brotli_enabled and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            uncompressed_responses_total.labels("not_accepted").inc()
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Buffers the start of a response until it can decide whether to compress it."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            reason = None
+            if "content-encoding" in headers:
+                reason = "already_encoded"
+            elif message["status"] < 200 or message["status"] in (204, 304):
+                reason = "no_body"
+            elif not content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.endswith("+json"):
+                reason = "content_type"
+            elif "content-length" in headers and int(headers["content-length"]) < self.middleware.minimum_size:
+                reason = "too_small"
+
+            if reason:
+                uncompressed_responses_total.labels(reason).inc()
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            await self._send({
+                "type": "http.response.body",
+                "body": self.compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+            if not more_body:
+                self._record()
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if more_body and self.buffered < self.middleware.minimum_size:
+            return  # Keep buffering until we know it's big enough
+
+        data = b"".join(self.buffer)
+        self.buffer = []
+        headers = MutableHeaders(raw=self.start_message["headers"])
+
+        if self.buffered < self.middleware.minimum_size:
+            uncompressed_responses_total.labels("too_small").inc()
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": data, "more_body": False})
+            return
+
+        self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        compressed = self.compressor.compress(data, final=not more_body)
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(compressed))
+
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        if not more_body:
+            self._record()
+
+    def _record(self):
+        compressor = self.compressor
+        compressed_responses_total.labels(self.encoding).inc()
+        compression_bytes_in_total.labels(self.encoding).inc(compressor.bytes_in)
+        compression_bytes_out_total.labels(self.encoding).inc(compressor.bytes_out)
+        if compressor.bytes_out:
+            compression_ratio.labels(self.encoding).observe(compressor.bytes_in / compressor.bytes_out)
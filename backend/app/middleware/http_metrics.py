@@ -0,0 +1,49 @@
+"""
+Per-route HTTP request metrics.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+from app.middleware.query_stats import route_label
+
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response is fully sent", ["route", "status"]
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled"
+)
+
+
+class HTTPMetricsMiddleware:
+    """
+    Records request latency labelled by route template (e.g. "GET /api/rooms/{room_id}")
+    and status code. Unmatched paths share one label, so cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        http_requests_in_progress.inc()
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec()
+            http_request_duration_seconds.labels(route_label(scope), status_code).observe(
+                time.perf_counter() - start
+            )
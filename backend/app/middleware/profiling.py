@@ -0,0 +1,60 @@
+"""
+Per-request cProfile for HTTP requests that carry a profiling token.
+"""
+import re
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.profiling import output_path, request_profiler, verify_profile_token
+
+PROFILE_HEADER = "x-profile"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request with cProfile when it sends `X-Profile: <token>`, using
+    a token from POST /api/admin/profiling/token. The response names the
+    stats file in X-Profile-File (or says X-Profile: busy when another
+    request is being profiled in this process).
+
+    cProfile sees everything the event loop runs while the request is in
+    flight, so profile on a quiet worker; the request's own calls are under
+    its endpoint in the call tree.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if not token or not verify_profile_token(token):
+            await self.app(scope, receive, send)
+            return
+
+        profile = request_profiler.start()
+        if profile is None:
+            async def send_busy(message: Message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("X-Profile", "busy")
+                await send(message)
+
+            await self.app(scope, receive, send_busy)
+            return
+
+        label = re.sub(r"[^A-Za-z0-9]+", "_", f"{scope['method']} {scope['path']}").strip("_")
+        path = output_path(f"request-{label[:80]}", ".prof")
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", str(path))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            request_profiler.finish(profile, path)
@@ -0,0 +1,48 @@
+"""
+Per-request database query accounting for HTTP requests.
+"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import track_queries
+
+
+def route_label(scope: Scope) -> str:
+    """Metric label for a request: method plus the matched route template."""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    return f"{scope.get('method', 'WS')} {path}"
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the queries each HTTP request issues (see app.db.instrumentation).
+    With expose_headers, adds X-DB-Query-Count, X-DB-Query-Time-Ms and
+    X-DB-Slowest-Query-Ms to every response.
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_stats(message: Message):
+                if message["type"] == "http.response.start":
+                    # Routing has happened by now, so the route template is known
+                    stats.operation = route_label(scope)
+                    if self.expose_headers:
+                        headers = MutableHeaders(scope=message)
+                        headers.append("X-DB-Query-Count", str(stats.count))
+                        headers.append("X-DB-Query-Time-Ms", f"{stats.total_seconds * 1000:.2f}")
+                        headers.append("X-DB-Slowest-Query-Ms", f"{stats.slowest_seconds * 1000:.2f}")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                stats.operation = route_label(scope)
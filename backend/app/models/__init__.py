@@ -5,5 +5,7 @@ from app.models.user import User
 from app.models.room import Room
 from app.models.message import Message
 from app.models.note import Note
+from app.models.room_stats import RoomStats
+from app.models.broker import BrokerPayload, BrokerPresence
 
-__all__ = ["User", "Room", "Message", "Note"]
+__all__ = ["User", "Room", "Message", "Note", "RoomStats", "BrokerPayload", "BrokerPresence"]
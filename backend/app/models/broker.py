@@ -0,0 +1,56 @@
+"""
+Tables used by the Postgres LISTEN/NOTIFY room event broker.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class BrokerPayload(Base):
+    """
+    Room events too large for a NOTIFY payload.
+    The event is stored here and the notification carries its ID; rows are
+    pruned once every node has had time to read them.
+
+    Attributes:
+        id: Referenced from the notification
+        payload: JSON-encoded event
+        created_at: Insert time (used for pruning)
+    """
+    __tablename__ = "broker_payloads"
+    __table_args__ = (
+        Index("ix_broker_payloads_created_at", "created_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<BrokerPayload(id={self.id}, bytes={len(self.payload or '')})>"
+
+
+class BrokerPresence(Base):
+    """
+    Live WebSocket connection counts per node and room.
+    Each node refreshes expires_at while it runs, so a crashed node's counts
+    stop being counted once they expire.
+
+    Attributes:
+        node_id: Worker that holds the connections (settings.NODE_ID)
+        room_id: Room the connections are in
+        connections: Number of connections
+        expires_at: Counts are ignored after this time
+    """
+    __tablename__ = "broker_presence"
+    __table_args__ = (
+        Index("ix_broker_presence_room_id", "room_id"),
+    )
+
+    node_id = Column(String(255), primary_key=True)
+    room_id = Column(Integer, primary_key=True)
+    connections = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<BrokerPresence(node_id={self.node_id}, room_id={self.room_id}, connections={self.connections})>"
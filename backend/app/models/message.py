@@ -1,7 +1,7 @@
 """
 Message model for real-time chat messages.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -11,6 +11,11 @@ class Message(Base):
     """
     Chat message model.
 
+    In PostgreSQL the table is range-partitioned by month on created_at
+    (see migration 0003 and app.db.partitions), with primary key
+    (id, created_at). ids come from a single sequence and stay unique,
+    so the ORM identifies rows by id alone.
+
     Attributes:
         id: Primary key
         room_id: Room this message belongs to
@@ -19,12 +24,16 @@ class Message(Base):
         created_at: Message timestamp
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        # Room history is always read newest-first within a room
+        Index("ix_messages_room_id_created_at", "room_id", "created_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     room = relationship("Room", back_populates="messages")
@@ -32,3 +41,22 @@ class Message(Base):
 
     def __repr__(self):
         return f"<Message(id={self.id}, room_id={self.room_id}, user_id={self.user_id})>"
+
+
+# Full-text search: generated tsvector column + GIN index (PostgreSQL only).
+# The column is not mapped on the model; it is only used by app.services.search.
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_messages_search_vector ON messages USING GIN (search_vector)"
+    ).execute_if(dialect="postgresql"),
+)
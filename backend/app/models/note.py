@@ -1,7 +1,7 @@
 """
 Note model for collaborative sticky notes.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -23,9 +23,13 @@ class Note(Base):
         updated_at: Last update timestamp
     """
     __tablename__ = "notes"
+    __table_args__ = (
+        # Board loads read a room's notes newest-first
+        Index("ix_notes_room_id_created_at", "room_id", "created_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     content = Column(Text, nullable=False)
     position_x = Column(Float, default=0.0, nullable=False)
@@ -40,3 +44,22 @@ class Note(Base):
 
     def __repr__(self):
         return f"<Note(id={self.id}, room_id={self.room_id}, user_id={self.user_id})>"
+
+
+# Full-text search: generated tsvector column + GIN index (PostgreSQL only).
+# The column is not mapped on the model; it is only used by app.services.search.
+event.listen(
+    Note.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Note.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_notes_search_vector ON notes USING GIN (search_vector)"
+    ).execute_if(dialect="postgresql"),
+)
@@ -1,7 +1,7 @@
 """
 Room model for collaboration workspaces.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
@@ -19,8 +19,12 @@ class Room(Base):
         created_at: Room creation timestamp
     """
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Room listing is ordered newest-first
+        Index("ix_rooms_created_at", "created_at"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, index=True)
     description = Column(Text, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
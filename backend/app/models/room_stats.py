@@ -0,0 +1,35 @@
+"""
+Room activity counters, maintained incrementally on every write.
+"""
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class RoomStats(Base):
+    """
+    Denormalized per-room activity counters.
+    One row per room, created with the room and updated in the same
+    transaction as every message/note write, so listings never COUNT(*).
+
+    Attributes:
+        room_id: Room these counters belong to (primary key)
+        message_count: Number of stored messages
+        note_count: Number of notes
+        last_activity_at: Time of the last message/note write (or room creation)
+        version: Bumped on every change to the room or its content (used for ETags)
+    """
+    __tablename__ = "room_stats"
+    __table_args__ = (
+        # "Most recently active" room listing
+        Index("ix_room_stats_last_activity_at", "last_activity_at"),
+    )
+
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+    note_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_activity_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    version = Column(BigInteger, default=0, server_default="0", nullable=False)
+
+    def __repr__(self):
+        return f"<RoomStats(room_id={self.room_id}, messages={self.message_count}, notes={self.note_count})>"
@@ -3,7 +3,13 @@ Pydantic schemas for request/response validation.
 """
 from app.schemas.user import User, UserCreate, UserLogin, UserResponse
 from app.schemas.token import Token, TokenData
+from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomListItem
 from app.schemas.message import MessageCreate, MessageUpdate, MessageResponse
-from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse
+from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteBatchRequest, NoteBatchResponse
+from app.schemas.search import SearchHit, SearchResponse
+from app.schemas.admin import (
+    LoopMonitorStatus, LoopMonitorUpdate, RoomActivity, RoomActivityList,
+    CPUProfileRequest, CPUProfileResult, MemoryProfileRequest, MemoryProfileResult, ProfileToken,
+)
 
-__all__ = ["User", "UserCreate", "UserLogin", "UserResponse", "Token", "TokenData", "MessageCreate", "MessageUpdate", "MessageResponse", "NoteCreate", "NoteUpdate", "NoteResponse"]
+__all__ = ["User", "UserCreate", "UserLogin", "UserResponse", "Token", "TokenData", "RoomCreate", "RoomUpdate", "RoomResponse", "RoomListItem", "MessageCreate", "MessageUpdate", "MessageResponse", "NoteCreate", "NoteUpdate", "NoteResponse", "NoteBatchRequest", "NoteBatchResponse", "SearchHit", "SearchResponse", "LoopMonitorStatus", "LoopMonitorUpdate", "RoomActivity", "RoomActivityList", "CPUProfileRequest", "CPUProfileResult", "MemoryProfileRequest", "MemoryProfileResult", "ProfileToken"]
@@ -0,0 +1,100 @@
+"""
+Admin schemas for runtime diagnostics.
+"""
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+
+class LoopMonitorStatus(BaseModel):
+    """Schema for the event-loop monitor state of the serving process."""
+    lag_seconds: float
+    probe_interval_seconds: float
+    slow_callback_detection: bool
+    slow_callback_threshold_seconds: float
+    stalls_detected: int
+
+
+class LoopMonitorUpdate(BaseModel):
+    """Schema for toggling slow-callback detection (fields left out are unchanged)."""
+    slow_callback_detection: Optional[bool] = None
+    slow_callback_threshold_seconds: Optional[float] = Field(None, gt=0, le=60)
+
+
+RoomSortKey = Literal[
+    "connections", "events_in_per_second", "events_out_per_second",
+    "bytes_out_per_second", "broadcasts_in_progress", "slow_consumers",
+]
+
+
+class RoomActivity(BaseModel):
+    """Schema for one room's live activity on the serving process."""
+    room_id: int
+    connections: int
+    events_in_per_second: float
+    events_out_per_second: float
+    bytes_out_per_second: float
+    broadcasts_in_progress: int
+    slow_consumers: int
+
+
+class RoomActivityList(BaseModel):
+    """Schema for the hottest rooms on the serving process."""
+    node_id: str
+    window_seconds: int
+    total_connections: int
+    active_rooms: int
+    broker: str
+    broker_pending_events: int
+    rooms: List[RoomActivity]
+
+
+class CPUProfileRequest(BaseModel):
+    """Schema for starting a sampled CPU profile."""
+    seconds: float = Field(10.0, gt=0, le=300)
+    interval_ms: float = Field(5.0, ge=1, le=1000)
+    top: int = Field(20, ge=1, le=200)
+
+
+class ProfiledFunction(BaseModel):
+    """Schema for one function's share of CPU samples."""
+    function: str
+    own_samples: int
+    total_samples: int
+
+
+class CPUProfileResult(BaseModel):
+    """Schema for a finished CPU profile (collapsed stacks in `file`)."""
+    file: str
+    seconds: float
+    interval_seconds: float
+    samples: int
+    top: List[ProfiledFunction]
+
+
+class MemoryProfileRequest(BaseModel):
+    """Schema for taking a tracemalloc snapshot."""
+    seconds: float = Field(30.0, ge=0, le=600)
+    frames: int = Field(1, ge=1, le=50)
+    top: int = Field(20, ge=1, le=200)
+
+
+class AllocationSite(BaseModel):
+    """Schema for memory still allocated from one source line."""
+    location: str
+    size_bytes: int
+    count: int
+
+
+class MemoryProfileResult(BaseModel):
+    """Schema for a tracemalloc snapshot (loadable with tracemalloc.Snapshot.load)."""
+    file: str
+    seconds: float
+    traced_bytes: int
+    peak_traced_bytes: int
+    top: List[AllocationSite]
+
+
+class ProfileToken(BaseModel):
+    """Schema for a per-request profiling token (send as the X-Profile header)."""
+    token: str
+    expires_in: int
@@ -2,7 +2,7 @@
 Note schemas for request/response validation.
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
 from datetime import datetime
 
 
@@ -37,3 +37,46 @@ class NoteResponse(NoteBase):
 
     class Config:
         from_attributes = True
+
+
+class NoteBatchCreate(NoteBase):
+    """Batch operation: create a note."""
+    op: Literal["create"]
+
+
+class NoteBatchUpdate(NoteUpdate):
+    """Batch operation: update a note (only provided fields are changed)."""
+    op: Literal["update"]
+    id: int
+
+
+class NoteBatchDelete(BaseModel):
+    """Batch operation: delete a note."""
+    op: Literal["delete"]
+    id: int
+
+
+NoteBatchOperation = Annotated[
+    Union[NoteBatchCreate, NoteBatchUpdate, NoteBatchDelete],
+    Field(discriminator="op"),
+]
+
+
+class NoteBatchRequest(BaseModel):
+    """Schema for a batch of note operations applied in one transaction."""
+    operations: List[NoteBatchOperation] = Field(..., min_length=1, max_length=500)
+
+
+class NoteBatchResult(BaseModel):
+    """Outcome of a single batch operation."""
+    index: int
+    op: str
+    status: str  # created, updated, deleted, not_found, forbidden, duplicate
+    id: Optional[int] = None
+    note: Optional[NoteResponse] = None
+    detail: Optional[str] = None
+
+
+class NoteBatchResponse(BaseModel):
+    """Schema for batch results, in the same order as the submitted operations."""
+    results: List[NoteBatchResult]
@@ -31,3 +31,11 @@ class RoomResponse(RoomBase):
 
     class Config:
         from_attributes = True
+
+
+class RoomListItem(RoomResponse):
+    """Schema for a room in listings, with its activity counters."""
+    message_count: int = 0
+    note_count: int = 0
+    last_activity_at: datetime
+    active_connections: int = 0
@@ -0,0 +1,23 @@
+"""
+Search schemas for room full-text search results.
+"""
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from datetime import datetime
+
+
+class SearchHit(BaseModel):
+    """A single ranked search match (message or note)."""
+    kind: Literal["message", "note"]
+    id: int
+    room_id: int
+    user_id: int
+    content: str
+    created_at: datetime
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    """Schema for a page of search results."""
+    results: List[SearchHit]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
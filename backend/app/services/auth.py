@@ -8,7 +8,7 @@ from typing import Optional
 
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_and_update_password
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -18,12 +18,21 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
-    """Authenticate a user by email and password."""
+    """
+    Authenticate a user by email and password.
+    Hashes made with an outdated bcrypt cost are upgraded transparently.
+    """
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+
+    verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return None
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 
@@ -38,7 +47,7 @@ async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
 
     db_user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
         full_name=user_in.full_name,
         is_active=True,
         is_superuser=False
@@ -9,7 +9,13 @@ from typing import List, Optional
 from app.models.message import Message
 from app.models.room import Room
 from app.models.user import User
-from app.schemas.message import MessageCreate, MessageUpdate
+from app.schemas.message import MessageCreate, MessageUpdate, MessageResponse
+from app.core.serialization import schema_columns, dumps_rows
+from app.services.room_stats import record_room_activity
+from app.services.room_cache import room_cache
+
+# Columns of a list page, in MessageResponse field order
+_PAGE_COLUMNS = schema_columns(Message, MessageResponse)
 
 
 async def create_message(db: AsyncSession, room_id: int, message_in: MessageCreate, user: User) -> Message:
@@ -27,7 +33,9 @@ async def create_message(db: AsyncSession, room_id: int, message_in: MessageCrea
         user_id=user.id
     )
     db.add(db_message)
+    await record_room_activity(db, room_id, messages=1)
     await db.commit()
+    await room_cache.invalidate(room_id, "messages")
     await db.refresh(db_message)
     return db_message
 
@@ -56,6 +64,35 @@ async def get_messages_by_room(
     return result.scalars().all()
 
 
+async def get_message_page(
+    db: AsyncSession,
+    room_id: int,
+    skip: int = 0,
+    limit: int = 50
+) -> bytes:
+    """
+    Get a page of a room's messages already serialized as JSON.
+    Same content and order as get_messages_by_room, but selects only the MessageResponse
+    columns and encodes the rows directly (no ORM instances, no validation).
+
+    Returns:
+        JSON array matching List[MessageResponse]
+    """
+    # Check if room exists
+    result = await db.execute(select(Room.id).where(Room.id == room_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+
+    result = await db.execute(
+        select(*_PAGE_COLUMNS)
+        .where(Message.room_id == room_id)
+        .offset(skip)
+        .limit(limit)
+        .order_by(Message.created_at.desc())
+    )
+    return dumps_rows(result.mappings())
+
+
 async def get_message_by_id(db: AsyncSession, message_id: int) -> Optional[Message]:
     """Get a message by ID."""
     result = await db.execute(select(Message).where(Message.id == message_id))
@@ -72,8 +109,10 @@ async def update_message(db: AsyncSession, message_id: int, message_in: MessageU
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this message")
 
     message.content = message_in.content
+    await record_room_activity(db, message.room_id)
 
     await db.commit()
+    await room_cache.invalidate(message.room_id, "messages")
     await db.refresh(message)
     return message
 
@@ -88,4 +127,6 @@ async def delete_message(db: AsyncSession, message_id: int, user: User) -> None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this message")
 
     await db.delete(message)
+    await record_room_activity(db, message.room_id, messages=-1)
     await db.commit()
+    await room_cache.invalidate(message.room_id, "messages")
@@ -1,15 +1,25 @@
 """
 Note service with business logic for CRUD operations.
 """
+from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, bindparam, func
 from fastapi import HTTPException, status
 from typing import List, Optional
 
 from app.models.note import Note
 from app.models.room import Room
 from app.models.user import User
-from app.schemas.note import NoteCreate, NoteUpdate
+from app.schemas.note import NoteCreate, NoteUpdate, NoteResponse, NoteBatchOperation
+from app.core.serialization import schema_columns, dumps_rows
+from app.services.room_stats import record_room_activity
+from app.services.room_cache import room_cache
+
+# Fields a batch "update" operation may change
+_UPDATABLE_FIELDS = ("content", "position_x", "position_y", "color")
+
+# Columns of a list page, in NoteResponse field order
+_PAGE_COLUMNS = schema_columns(Note, NoteResponse)
 
 
 async def create_note(db: AsyncSession, room_id: int, note_in: NoteCreate, user: User) -> Note:
@@ -30,7 +40,9 @@ async def create_note(db: AsyncSession, room_id: int, note_in: NoteCreate, user:
         user_id=user.id
     )
     db.add(db_note)
+    await record_room_activity(db, room_id, notes=1)
     await db.commit()
+    await room_cache.invalidate(room_id, "notes")
     await db.refresh(db_note)
     return db_note
 
@@ -59,6 +71,35 @@ async def get_notes_by_room(
     return result.scalars().all()
 
 
+async def get_note_page(
+    db: AsyncSession,
+    room_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> bytes:
+    """
+    Get a page of a room's notes already serialized as JSON.
+    Same content and order as get_notes_by_room, but selects only the NoteResponse
+    columns and encodes the rows directly (no ORM instances, no validation).
+
+    Returns:
+        JSON array matching List[NoteResponse]
+    """
+    # Check if room exists
+    result = await db.execute(select(Room.id).where(Room.id == room_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+
+    result = await db.execute(
+        select(*_PAGE_COLUMNS)
+        .where(Note.room_id == room_id)
+        .offset(skip)
+        .limit(limit)
+        .order_by(Note.created_at.desc())
+    )
+    return dumps_rows(result.mappings())
+
+
 async def get_note_by_id(db: AsyncSession, note_id: int) -> Optional[Note]:
     """Get a note by ID."""
     result = await db.execute(select(Note).where(Note.id == note_id))
@@ -83,8 +124,10 @@ async def update_note(db: AsyncSession, note_id: int, note_in: NoteUpdate, user:
         note.position_y = note_in.position_y
     if note_in.color is not None:
         note.color = note_in.color
+    await record_room_activity(db, note.room_id)
 
     await db.commit()
+    await room_cache.invalidate(note.room_id, "notes")
     await db.refresh(note)
     return note
 
@@ -99,4 +142,142 @@ async def delete_note(db: AsyncSession, note_id: int, user: User) -> None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this note")
 
     await db.delete(note)
+    await record_room_activity(db, note.room_id, notes=-1)
     await db.commit()
+    await room_cache.invalidate(note.room_id, "notes")
+
+
+async def apply_note_batch(
+    db: AsyncSession,
+    room_id: int,
+    operations: List[NoteBatchOperation],
+    user: User
+) -> List[dict]:
+    """
+    Apply a batch of create/update/delete operations to a room's notes.
+
+    Everything runs in one transaction using set-based statements:
+    one ownership lookup (which locks the referenced notes until commit),
+    one multi-row INSERT, one executemany UPDATE per distinct set of changed
+    fields, and one DELETE.
+    Operations that fail (missing note, not the author, repeated note ID)
+    are reported per item and do not abort the rest of the batch.
+
+    Returns:
+        List of result dicts in the same order as `operations`
+    """
+    # Check if room exists
+    result = await db.execute(select(Room.id).where(Room.id == room_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+
+    # Ownership of every referenced note, in one query; the row locks keep
+    # concurrent writers from deleting or reassigning them before we commit
+    referenced_ids = {op.id for op in operations if op.op != "create"}
+    owners = {}
+    if referenced_ids:
+        result = await db.execute(
+            select(Note.id, Note.user_id)
+            .where(Note.room_id == room_id, Note.id.in_(referenced_ids))
+            .with_for_update()
+        )
+        owners = dict(result.all())
+
+    results: List[Optional[dict]] = [None] * len(operations)
+    creates = []  # (index, values)
+    update_groups = defaultdict(list)  # changed fields -> [(index, note_id, values)]
+    deletes = []  # (index, note_id)
+    seen_ids = set()
+
+    for index, op in enumerate(operations):
+        if op.op == "create":
+            creates.append((index, {
+                "content": op.content,
+                "position_x": op.position_x,
+                "position_y": op.position_y,
+                "color": op.color,
+                "room_id": room_id,
+                "user_id": user.id,
+            }))
+            continue
+
+        base = {"index": index, "op": op.op, "id": op.id}
+        if op.id in seen_ids:
+            results[index] = {**base, "status": "duplicate", "detail": "Note already used earlier in this batch"}
+            continue
+        seen_ids.add(op.id)
+
+        owner_id = owners.get(op.id)
+        if owner_id is None:
+            results[index] = {**base, "status": "not_found", "detail": "Note not found"}
+        elif owner_id != user.id:
+            results[index] = {**base, "status": "forbidden", "detail": f"Not authorized to {op.op} this note"}
+        elif op.op == "update":
+            # Update only provided fields
+            values = {field: getattr(op, field) for field in _UPDATABLE_FIELDS if getattr(op, field) is not None}
+            update_groups[tuple(sorted(values))].append((index, op.id, values))
+        else:
+            deletes.append((index, op.id))
+
+    notes_table = Note.__table__
+
+    if creates:
+        created = await db.scalars(
+            insert(Note).returning(Note, sort_by_parameter_order=True),
+            [values for _, values in creates],
+        )
+        for (index, _), note in zip(creates, created.all()):
+            results[index] = {"index": index, "op": "create", "status": "created", "id": note.id, "note": note}
+
+    updated_ids = {}
+    for fields, items in update_groups.items():
+        if fields:
+            stmt = (
+                update(notes_table)
+                .where(notes_table.c.id == bindparam("b_id"), notes_table.c.room_id == room_id)
+                .values(updated_at=func.now(), **{field: bindparam(f"b_{field}") for field in fields})
+            )
+            await db.execute(stmt, [
+                {"b_id": note_id, **{f"b_{field}": value for field, value in values.items()}}
+                for _, note_id, values in items
+            ])
+        for index, note_id, _ in items:
+            updated_ids[note_id] = index
+
+    if updated_ids:
+        # Reload inside the transaction, while the rows are still locked
+        result = await db.execute(
+            select(Note)
+            .where(Note.id.in_(updated_ids.keys()))
+            .execution_options(populate_existing=True)
+        )
+        for note in result.scalars():
+            index = updated_ids.pop(note.id)
+            results[index] = {"index": index, "op": "update", "status": "updated", "id": note.id, "note": note}
+
+    deleted_ids = set()
+    if deletes:
+        result = await db.execute(
+            delete(notes_table)
+            .where(notes_table.c.id.in_([note_id for _, note_id in deletes]), notes_table.c.room_id == room_id)
+            .returning(notes_table.c.id)
+        )
+        deleted_ids = set(result.scalars())
+        for index, note_id in deletes:
+            if note_id in deleted_ids:
+                results[index] = {"index": index, "op": "delete", "status": "deleted", "id": note_id}
+
+    # Anything not reported yet was gone by the time we wrote it
+    for index, op in enumerate(operations):
+        if results[index] is None:
+            results[index] = {"index": index, "op": op.op, "id": op.id, "status": "not_found", "detail": "Note not found"}
+
+    changed = any(r["status"] in ("created", "updated", "deleted") for r in results)
+    if changed:
+        await record_room_activity(db, room_id, notes=len(creates) - len(deleted_ids))
+
+    await db.commit()
+    if changed:
+        await room_cache.invalidate(room_id, "notes")
+
+    return results
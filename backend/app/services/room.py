@@ -7,8 +7,11 @@ from fastapi import HTTPException, status
 from typing import List, Optional
 
 from app.models.room import Room
+from app.models.room_stats import RoomStats
 from app.models.user import User
 from app.schemas.room import RoomCreate, RoomUpdate
+from app.services.room_cache import room_cache
+from app.services.room_stats import bump_room_version
 
 
 async def create_room(db: AsyncSession, room_in: RoomCreate, user: User) -> Room:
@@ -19,17 +22,57 @@ async def create_room(db: AsyncSession, room_in: RoomCreate, user: User) -> Room
         created_by=user.id
     )
     db.add(db_room)
+    await db.flush()
+    db.add(RoomStats(room_id=db_room.id))
     await db.commit()
+    # Drop any "room doesn't exist" lookups cached for this ID
+    await room_cache.invalidate(db_room.id)
     await db.refresh(db_room)
     return db_room
 
 
-async def get_rooms(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Room]:
-    """Get all rooms with pagination."""
-    result = await db.execute(
-        select(Room).offset(skip).limit(limit).order_by(Room.created_at.desc())
-    )
-    return result.scalars().all()
+async def get_rooms(db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "created") -> List[dict]:
+    """
+    Get rooms with their activity counters, paginated.
+
+    Args:
+        db: Database session
+        skip: Rows to skip
+        limit: Page size
+        sort: "created" (newest rooms first) or "activity" (most recently active first)
+
+    Returns:
+        List of dicts with the room's fields plus message_count, note_count and last_activity_at
+    """
+    if sort == "activity":
+        # Walk ix_room_stats_last_activity_at backwards; every room has a stats row
+        query = (
+            select(Room, RoomStats)
+            .select_from(RoomStats)
+            .join(Room, Room.id == RoomStats.room_id)
+            .order_by(RoomStats.last_activity_at.desc(), RoomStats.room_id.desc())
+        )
+    else:
+        query = (
+            select(Room, RoomStats)
+            .outerjoin(RoomStats, RoomStats.room_id == Room.id)
+            .order_by(Room.created_at.desc())
+        )
+
+    result = await db.execute(query.offset(skip).limit(limit))
+    rooms = []
+    for room, stats in result.all():
+        rooms.append({
+            "id": room.id,
+            "name": room.name,
+            "description": room.description,
+            "created_by": room.created_by,
+            "created_at": room.created_at,
+            "message_count": stats.message_count if stats else 0,
+            "note_count": stats.note_count if stats else 0,
+            "last_activity_at": stats.last_activity_at if stats else room.created_at,
+        })
+    return rooms
 
 
 async def get_room_by_id(db: AsyncSession, room_id: int) -> Optional[Room]:
@@ -51,8 +94,10 @@ async def update_room(db: AsyncSession, room_id: int, room_in: RoomUpdate, user:
         room.name = room_in.name
     if room_in.description is not None:
         room.description = room_in.description
+    await bump_room_version(db, room_id)
 
     await db.commit()
+    await room_cache.invalidate(room_id, "version")
     await db.refresh(room)
     return room
 
@@ -68,3 +113,4 @@ async def delete_room(db: AsyncSession, room_id: int, user: User) -> None:
 
     await db.delete(room)
     await db.commit()
+    await room_cache.invalidate(room_id)
@@ -0,0 +1,296 @@
+"""
+Read-through cache for room content listings (messages and notes).
+
+Serialized JSON response bodies are cached per room, content kind and page
+shape (skip/limit), in process and in Redis. The room's version (used for
+ETags) is cached the same way under the "version" kind. The message and note services
+invalidate a room's entries right after every committed write, and other
+nodes drop their local copies through a Redis channel.
+
+Concurrent misses for the same page on one node share a single database load.
+That load runs in its own short-lived session (loaders receive it), never in
+a request's session, which the first caller's request could close mid-load.
+For a short hold window after an invalidation (at least the replica lag
+bound when a read replica is configured), freshly loaded pages are served
+but not stored. This keeps a load that started before the write from
+repopulating the cache with stale data.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import read_session_scope
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:rooms:invalidate"
+KEY_PREFIX = "room_cache"
+KINDS = ("messages", "notes", "version")
+_RECONNECT_MIN_DELAY = 0.5
+_RECONNECT_MAX_DELAY = 30.0
+
+room_cache_lookups_total = registry.counter(
+    "room_cache_lookups_total", "Room content cache lookups", ["kind", "result"]
+)
+room_cache_invalidations_total = registry.counter(
+    "room_cache_invalidations_total", "Room content cache invalidations", ["kind", "source"]
+)
+room_cache_fills_skipped_total = registry.counter(
+    "room_cache_fills_skipped_total", "Loaded pages not cached because the room was just invalidated", ["kind"]
+)
+
+# Store a page in Redis unless the room/kind is inside its post-invalidation hold
+_FILL_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+def _hold_seconds() -> float:
+    hold = settings.ROOM_CACHE_INVALIDATION_HOLD_SECONDS
+    if settings.DATABASE_READ_URL:
+        # Replica reads may lag the write that triggered the invalidation
+        hold = max(hold, settings.READ_REPLICA_MAX_LAG_SECONDS)
+    return hold
+
+
+class RoomContentCache:
+    """
+    Two-level (local LRU + Redis hash) cache of serialized room listings.
+
+    Local keys include a per-(kind, room) generation, so invalidation is O(1):
+    bumping the generation orphans every cached page shape of that room, and
+    the LRU evicts them. Generations come from one node-wide counter and only
+    the most recently bumped rooms keep their own; the rest share the base
+    generation, which moves past every generation handed out before it. In
+    Redis each (room, kind) is one hash whose fields are page shapes, so
+    invalidation is a single DEL.
+
+    While the invalidation listener is disconnected the local level is
+    skipped, since other nodes' writes would not reach it.
+    """
+
+    def __init__(self):
+        self.enabled = settings.ROOM_CACHE_ENABLED
+        self._cache = TTLCache(settings.ROOM_CACHE_MAX_SIZE, settings.ROOM_CACHE_TTL_SECONDS)
+        self._holds = TTLCache(settings.ROOM_CACHE_MAX_SIZE, _hold_seconds())
+        self._generations: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        self._last_generation = 0
+        self._base_generation = 0
+        self._listener_down = False
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._redis = None
+        self._fill_script = None
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _redis_keys(kind: str, room_id: int) -> Tuple[str, str]:
+        base = f"{KEY_PREFIX}:{room_id}:{kind}"
+        return base, f"{base}:hold"
+
+    async def get_or_load(
+        self,
+        kind: str,
+        room_id: int,
+        skip: int,
+        limit: int,
+        loader: Callable[[AsyncSession], Awaitable[bytes]]
+    ) -> Tuple[bytes, str]:
+        """
+        Get a serialized page, loading it on a miss.
+
+        Args:
+            kind: "messages", "notes" or "version"
+            room_id: The room ID
+            skip: Page offset
+            limit: Page size
+            loader: Coroutine function taking a database session and returning the serialized page
+
+        Returns:
+            Tuple of (JSON body, cache result: "local", "redis", "miss" or "coalesced")
+        """
+        if not self.enabled:
+            async with read_session_scope() as db:
+                return await loader(db), "bypass"
+
+        room_key = (kind, room_id)
+        shape = f"{skip}:{limit}"
+        local_key = (kind, room_id, self._generation(room_key), shape)
+
+        body = None if self._listener_down else self._cache.get(local_key)
+        if body is not None:
+            room_cache_lookups_total.labels(kind, "local").inc()
+            return body, "local"
+
+        if self._redis is not None:
+            try:
+                cached = await self._redis.hget(self._redis_keys(kind, room_id)[0], shape)
+            except Exception as e:
+                logger.warning(f"Room cache Redis lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                body = cached.encode()
+                # Only keep it if no invalidation arrived while we were waiting on Redis
+                if not self._listener_down and local_key[2] == self._generation(room_key):
+                    self._cache.set(local_key, body)
+                room_cache_lookups_total.labels(kind, "redis").inc()
+                return body, "redis"
+
+        task = self._inflight.get(local_key)
+        if task is not None:
+            room_cache_lookups_total.labels(kind, "coalesced").inc()
+            return await asyncio.shield(task), "coalesced"
+
+        room_cache_lookups_total.labels(kind, "miss").inc()
+        task = asyncio.ensure_future(self._load(local_key, loader))
+        self._inflight[local_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(local_key, None))
+        return await asyncio.shield(task), "miss"
+
+    async def _load(self, local_key: tuple, loader: Callable[[AsyncSession], Awaitable[bytes]]) -> bytes:
+        kind, room_id, generation, shape = local_key
+        async with read_session_scope() as db:
+            body = await loader(db)
+
+        if generation != self._generation((kind, room_id)) or (kind, room_id) in self._holds:
+            room_cache_fills_skipped_total.labels(kind).inc()
+            return body
+
+        if not self._listener_down:
+            self._cache.set(local_key, body)
+        if self._fill_script is not None:
+            try:
+                await self._fill_script(
+                    keys=list(self._redis_keys(kind, room_id)),
+                    args=[shape, body.decode(), int(settings.ROOM_CACHE_TTL_SECONDS * 1000)],
+                )
+            except Exception as e:
+                logger.warning(f"Room cache Redis fill failed: {e}")
+        return body
+
+    def _generation(self, room_key: Tuple[str, int]) -> int:
+        return self._generations.get(room_key, self._base_generation)
+
+    def evict(self, kind: str, room_id: int):
+        """Drop a room's cached pages of one kind from this node only."""
+        room_key = (kind, room_id)
+        self._last_generation += 1
+        self._generations[room_key] = self._last_generation
+        self._generations.move_to_end(room_key)
+        if len(self._generations) > settings.ROOM_CACHE_MAX_SIZE:
+            # The oldest room falls back to the base generation, which becomes its
+            # current one; pages cached under older generations are orphaned
+            _, self._base_generation = self._generations.popitem(last=False)
+        self._holds.set(room_key, True)
+
+    async def invalidate(self, room_id: int, *kinds: str):
+        """
+        Drop a room's cached pages everywhere. Call after the write has committed.
+
+        Args:
+            room_id: The room that changed
+            kinds: Content kinds that changed (defaults to all); the version is always dropped
+        """
+        kinds = tuple(dict.fromkeys((*(kinds or KINDS), "version")))
+        for kind in kinds:
+            self.evict(kind, room_id)
+            room_cache_invalidations_total.labels(kind, "local").inc()
+
+        if self._redis is None:
+            return
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                for kind in kinds:
+                    data_key, hold_key = self._redis_keys(kind, room_id)
+                    pipe.delete(data_key)
+                    pipe.set(hold_key, 1, px=int(_hold_seconds() * 1000))
+                    pipe.publish(INVALIDATION_CHANNEL, f"{kind}:{room_id}")
+                await pipe.execute()
+        except Exception as e:
+            # The write already committed; entries expire after ROOM_CACHE_TTL_SECONDS at worst
+            logger.error(f"Room cache invalidation failed for room {room_id}: {e}")
+
+    async def start(self, redis_client):
+        """
+        Use Redis as the shared cache level and listen for invalidations from other nodes.
+
+        Args:
+            redis_client: Connected redis.asyncio client
+        """
+        self._redis = redis_client
+        self._fill_script = redis_client.register_script(_FILL_SCRIPT)
+        await self._subscribe()
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info(f"✅ Room cache listening on {INVALIDATION_CHANNEL}")
+
+    async def stop(self):
+        """Stop the invalidation listener and drop local entries."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub:
+            await self._pubsub.close()
+            self._pubsub = None
+        self._redis = None
+        self._fill_script = None
+        self._listener_down = False
+        self._cache.clear()
+
+    async def _subscribe(self):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        self._pubsub = pubsub
+
+    async def _listen(self):
+        """Apply invalidations from other nodes, resubscribing with backoff when the connection drops."""
+        delay = _RECONNECT_MIN_DELAY
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    # Invalidations sent while we were away are lost - start from empty
+                    self._cache.clear()
+                    self._listener_down = False
+                    logger.warning("Room cache invalidation listener reconnected")
+                delay = _RECONNECT_MIN_DELAY
+
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        kind, room_id = message["data"].rsplit(":", 1)
+                        self.evict(kind, int(room_id))
+                        room_cache_invalidations_total.labels(kind, "remote").inc()
+                raise ConnectionError("pub/sub connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Without invalidations we could serve stale pages - skip the local level until resubscribed
+                logger.error("Room cache invalidation listener failed (retrying in %.1fs): %s", delay, e)
+                self._listener_down = True
+                self._cache.clear()
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.close()
+                    except Exception:
+                        pass
+                    self._pubsub = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RECONNECT_MAX_DELAY)
+
+
+# Global room content cache instance
+room_cache = RoomContentCache()
@@ -0,0 +1,77 @@
+"""
+Room stats service: incremental maintenance of the room_stats counters.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from typing import Optional
+
+from app.models.room_stats import RoomStats
+from app.services.room_cache import room_cache
+
+
+async def record_room_activity(
+    db: AsyncSession,
+    room_id: int,
+    messages: int = 0,
+    notes: int = 0
+) -> None:
+    """
+    Adjust a room's counters, touch its last-activity time and bump its version.
+    Runs as a single UPDATE in the caller's transaction, so the counters
+    commit (or roll back) together with the write they describe.
+
+    Args:
+        db: Database session
+        room_id: Room that changed
+        messages: Change in message count (may be negative)
+        notes: Change in note count (may be negative)
+    """
+    values = {"last_activity_at": func.now(), "version": RoomStats.version + 1}
+    if messages:
+        values["message_count"] = RoomStats.message_count + messages
+    if notes:
+        values["note_count"] = RoomStats.note_count + notes
+
+    await db.execute(
+        update(RoomStats)
+        .where(RoomStats.room_id == room_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_room_version(db: AsyncSession, room_id: int) -> None:
+    """Bump a room's version without counting it as activity (e.g. a rename)."""
+    await db.execute(
+        update(RoomStats)
+        .where(RoomStats.room_id == room_id)
+        .values(version=RoomStats.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_room_version(db: AsyncSession, room_id: int) -> Optional[int]:
+    """
+    Current version of a room, read from room_stats only.
+
+    Returns:
+        The version, or None if the room doesn't exist
+    """
+    result = await db.execute(select(RoomStats.version).where(RoomStats.room_id == room_id))
+    return result.scalar_one_or_none()
+
+
+async def get_cached_room_version(room_id: int) -> Optional[int]:
+    """
+    Current version of a room through the room content cache.
+    Every write that bumps the version also invalidates the cached value.
+
+    Returns:
+        The version, or None if the room doesn't exist
+    """
+    async def load_version(db: AsyncSession) -> bytes:
+        version = await get_room_version(db, room_id)
+        return b"" if version is None else str(version).encode()
+
+    body, _ = await room_cache.get_or_load("version", room_id, 0, 0, load_version)
+    return int(body) if body else None
@@ -0,0 +1,102 @@
+"""
+Search service: ranked full-text search over a room's messages and notes.
+Backed by generated tsvector columns with GIN indexes (PostgreSQL).
+"""
+import base64
+import json
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from fastapi import HTTPException, status
+from typing import List, Optional, Tuple
+
+from app.models.room import Room
+
+# Must match the text search configuration used by the generated columns
+SEARCH_CONFIG = "english"
+
+_SEARCH_SQL = """
+    WITH q AS (SELECT websearch_to_tsquery('{config}', :query) AS query),
+    hits AS (
+        SELECT 'message' AS kind, m.id, m.room_id, m.user_id, m.content, m.created_at,
+               ts_rank(m.search_vector, q.query) AS rank
+        FROM messages m, q
+        WHERE m.room_id = :room_id AND m.search_vector @@ q.query
+        UNION ALL
+        SELECT 'note' AS kind, n.id, n.room_id, n.user_id, n.content, n.created_at,
+               ts_rank(n.search_vector, q.query) AS rank
+        FROM notes n, q
+        WHERE n.room_id = :room_id AND n.search_vector @@ q.query
+    )
+    SELECT kind, id, room_id, user_id, content, created_at, rank
+    FROM hits
+    {keyset}
+    ORDER BY rank DESC, kind DESC, id DESC
+    LIMIT :limit
+"""
+
+# Keyset condition: rows strictly after the cursor in (rank, kind, id) DESC order
+_KEYSET_SQL = "WHERE (rank, kind, id) < (CAST(:after_rank AS real), :after_kind, :after_id)"
+
+
+def encode_cursor(rank: float, kind: str, item_id: int) -> str:
+    """Encode the sort key of the last returned hit as an opaque cursor."""
+    raw = json.dumps([rank, kind, item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        400: Malformed cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, kind, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), str(kind), int(item_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def search_room(
+    db: AsyncSession,
+    room_id: int,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Search messages and notes in a room, best matches first.
+
+    Args:
+        db: Database session
+        room_id: Room to search
+        query: Web-style search query (quoted phrases, OR, -exclusions)
+        limit: Page size
+        cursor: Cursor returned by the previous page, if any
+
+    Returns:
+        Tuple of (hits, next cursor or None when there are no more results)
+    """
+    # Check if room exists
+    result = await db.execute(select(Room.id).where(Room.id == room_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+
+    params = {"query": query, "room_id": room_id, "limit": limit + 1}
+    keyset = ""
+    if cursor:
+        params["after_rank"], params["after_kind"], params["after_id"] = decode_cursor(cursor)
+        keyset = _KEYSET_SQL
+
+    result = await db.execute(text(_SEARCH_SQL.format(config=SEARCH_CONFIG, keyset=keyset)), params)
+    hits = [dict(row) for row in result.mappings()]
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last = hits[-1]
+        next_cursor = encode_cursor(last["rank"], last["kind"], last["id"])
+
+    return hits, next_cursor
@@ -0,0 +1,226 @@
+"""
+Authenticated-user cache.
+Keeps recently authenticated users in memory (keyed by token subject) so
+authenticated requests don't hit the database on every call.
+Entries are invalidated on every node through a Redis channel whenever a
+user row is updated or deleted.
+If that subscription drops, the cache is bypassed and emptied until it is
+re-established.
+"""
+import asyncio
+import logging
+from typing import Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:users:invalidate"
+_RECONNECT_MIN_DELAY = 0.5
+_RECONNECT_MAX_DELAY = 30.0
+
+user_cache_lookups_total = registry.counter(
+    "user_cache_lookups_total", "Authenticated-user cache lookups", ["result"]
+)
+user_cache_invalidations_total = registry.counter(
+    "user_cache_invalidations_total", "Authenticated-user cache invalidations", ["source"]
+)
+
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+class UserCache:
+    """
+    Bounded LRU + TTL cache of user records keyed by JWT subject (email).
+
+    Cached values are plain column snapshots; every hit returns a fresh
+    detached User instance so requests never share ORM state.
+
+    Callers read `generation()` before loading a user on a miss and pass it
+    to `set`. Every eviction bumps the (node-wide) generation, so a user
+    loaded before an invalidation landed is not cached over it.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+        # Turned off at startup when other nodes can't be told about user changes
+        self.enabled = True
+        # Set while the invalidation listener is down: the cache is bypassed
+        self._listener_down = False
+        self._generation = 0
+        self._redis = None
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def get(self, subject: str) -> Optional[User]:
+        """
+        Get a cached user by token subject.
+
+        Args:
+            subject: The token subject (user email)
+
+        Returns:
+            Detached User instance, or None on a cache miss
+        """
+        if not self.enabled or self._listener_down:
+            return None
+        snapshot = self._cache.get(subject)
+        if snapshot is None:
+            user_cache_lookups_total.labels("miss").inc()
+            return None
+
+        user_cache_lookups_total.labels("hit").inc()
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    def generation(self) -> int:
+        """The current invalidation generation; take it before loading a user to cache."""
+        return self._generation
+
+    def set(self, subject: str, user: User, generation: int):
+        """
+        Cache an active user's column values.
+
+        Args:
+            subject: The token subject (user email)
+            user: The user loaded from the database
+            generation: `generation()` as read before the user was loaded
+        """
+        if not self.enabled or self._listener_down or not user.is_active:
+            return
+        if generation != self._generation:
+            # Something was invalidated while the user was loading - it may be this one
+            return
+        self._cache.set(subject, {key: getattr(user, key) for key in _USER_COLUMNS})
+
+    def evict(self, subject: str):
+        """Drop a subject from this node's cache only."""
+        self._generation += 1
+        self._cache.pop(subject)
+
+    def _clear(self):
+        self._generation += 1
+        self._cache.clear()
+
+    def invalidate(self, subject: str):
+        """
+        Drop a subject locally and tell the other nodes to drop it too.
+        Safe to call from synchronous code running on the event loop.
+        """
+        self.evict(subject)
+        user_cache_invalidations_total.labels("local").inc()
+
+        if self._redis is None:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self._redis.publish(INVALIDATION_CHANNEL, subject)
+            )
+        except RuntimeError:
+            # No running loop (e.g. a maintenance script) - nothing else to notify
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def start(self, redis_client):
+        """
+        Start listening for invalidations from other nodes.
+
+        Args:
+            redis_client: Connected redis.asyncio client
+        """
+        self._redis = redis_client
+        await self._subscribe()
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info(f"✅ User cache listening on {INVALIDATION_CHANNEL}")
+
+    async def _subscribe(self):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        self._pubsub = pubsub
+
+    async def stop(self):
+        """Stop the invalidation listener."""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub:
+            await self._pubsub.close()
+            self._pubsub = None
+        self._redis = None
+        self._listener_down = False
+        self._clear()
+
+    async def _listen(self):
+        """Apply invalidations from other nodes, resubscribing with backoff when the connection drops."""
+        delay = _RECONNECT_MIN_DELAY
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    # Invalidations sent while we were away are lost - start from empty
+                    self._clear()
+                    self._listener_down = False
+                    logger.warning("User cache invalidation listener reconnected")
+                delay = _RECONNECT_MIN_DELAY
+
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        self.evict(message["data"])
+                        user_cache_invalidations_total.labels("remote").inc()
+                raise ConnectionError("pub/sub connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Without invalidations we could serve stale users - bypass the cache until resubscribed
+                logger.error("User cache invalidation listener failed (retrying in %.1fs): %s", delay, e)
+                self._listener_down = True
+                self._clear()
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.close()
+                    except Exception:
+                        pass
+                    self._pubsub = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RECONNECT_MAX_DELAY)
+
+
+# Global user cache instance
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_user_invalidation(mapper, connection, target):
+    """Remember changed users; they are invalidated once the transaction commits."""
+    session = Session.object_session(target)
+    if session is None:
+        return
+    subjects = session.info.setdefault("user_cache_invalidate", set())
+    subjects.add(target.email)
+    # Also drop the old subject if the email itself changed
+    subjects.update(inspect(target).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_user_invalidations(session):
+    for subject in session.info.pop("user_cache_invalidate", ()):
+        user_cache.invalidate(subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_invalidations(session):
+    session.info.pop("user_cache_invalidate", None)
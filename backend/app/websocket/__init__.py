@@ -1,6 +1,11 @@
 """
 WebSocket module for real-time communication.
 """
+from app.core.config import settings
 from app.websocket.connection_manager import manager
+from app.websocket.broker import Broker, InProcessBroker, create_broker
 
-__all__ = ["manager"]
+# Room event broker selected by BROKER_BACKEND
+broker: Broker = create_broker(settings.BROKER_BACKEND)
+
+__all__ = ["manager", "broker", "Broker", "InProcessBroker", "create_broker"]
@@ -0,0 +1,200 @@
+"""
+Room event brokers: the publish/subscribe layer between WebSocket handlers.
+
+Every node publishes room events to the broker and subscribes the rooms it
+has local connections in. The backend is chosen with BROKER_BACKEND:
+
+- "redis": Redis pub/sub; events reach every node (app.websocket.redis_pubsub)
+- "postgres": Postgres LISTEN/NOTIFY; every node, no Redis (app.websocket.postgres_broker)
+- "memory": in-process delivery for single-node deployments and test runs
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional
+
+from app.core.metrics import registry
+from app.core.tracing import mark_delivered
+
+logger = logging.getLogger(__name__)
+
+# Event types used as metric labels; anything else (client-supplied) is "other"
+EVENT_TYPES = frozenset({"message", "note", "typing", "ping", "join", "leave", "notes_batch"})
+
+events_published_total = registry.counter(
+    "events_published_total", "Room events published to the broker, by type", ["type"]
+)
+events_delivered_total = registry.counter(
+    "events_delivered_total", "Room events received from the broker for local delivery, by type", ["type"]
+)
+
+
+def event_type_label(event_type) -> str:
+    """Bounded metric label for an event type."""
+    return event_type if isinstance(event_type, str) and event_type in EVENT_TYPES else "other"
+
+
+class Broker(ABC):
+    """
+    Fans room events out to the subscribers of every node, and tracks live
+    connection counts per room across nodes.
+    """
+
+    name: str = ""
+    # Redis client shared with the caches, if this backend has one
+    redis_client = None
+
+    @abstractmethod
+    async def connect(self):
+        """Open connections and start delivering events."""
+
+    @abstractmethod
+    async def disconnect(self):
+        """Stop delivering events and close connections."""
+
+    @abstractmethod
+    async def publish(self, room_id: int, message: dict):
+        """
+        Publish an event to a room on every node.
+
+        Args:
+            room_id: The target room ID
+            message: JSON-serializable event
+        """
+
+    @abstractmethod
+    async def subscribe(self, room_id: int, callback: Callable):
+        """
+        Deliver a room's events to a callback on this node.
+
+        Args:
+            room_id: The room ID to subscribe to
+            callback: Async function called with each event dict
+        """
+
+    @abstractmethod
+    async def unsubscribe(self, room_id: int):
+        """
+        Stop delivering a room's events on this node.
+
+        Args:
+            room_id: The room ID to unsubscribe from
+        """
+
+    @abstractmethod
+    async def set_room_connections(self, room_id: int, count: int):
+        """
+        Record this node's live connection count for a room.
+
+        Args:
+            room_id: The room ID
+            count: Number of local WebSocket connections in the room
+        """
+
+    @abstractmethod
+    async def get_room_connections(self, room_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Live connection counts for rooms, summed across all nodes.
+
+        Args:
+            room_ids: Rooms to look up
+
+        Returns:
+            Dict of room_id -> connection count (rooms with none are omitted)
+        """
+
+    def pending_events(self) -> int:
+        """Events received by this node and not yet delivered (0 without a local queue)."""
+        return 0
+
+
+class InProcessBroker(Broker):
+    """
+    Single-node broker. Published event dicts are handed to this process's
+    subscribers as-is: no network hop and no JSON round trip.
+
+    Events are queued and delivered by one dispatcher task in publish order,
+    like the Redis listener, so a publisher never waits on a room's fan-out.
+    Only correct when one process serves every WebSocket connection.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.subscriptions: Dict[int, Callable] = {}  # room_id -> callback
+        self._connections: Dict[int, int] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        logger.info("✅ Using in-process broker (single node)")
+
+    async def disconnect(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        self.subscriptions.clear()
+        self._connections.clear()
+
+    async def publish(self, room_id: int, message: dict):
+        self._queue.put_nowait((room_id, message))
+        events_published_total.labels(event_type_label(message.get("type"))).inc()
+
+    async def subscribe(self, room_id: int, callback: Callable):
+        self.subscriptions[room_id] = callback
+
+    def pending_events(self) -> int:
+        return self._queue.qsize()
+
+    async def unsubscribe(self, room_id: int):
+        self.subscriptions.pop(room_id, None)
+
+    async def set_room_connections(self, room_id: int, count: int):
+        if count > 0:
+            self._connections[room_id] = count
+        else:
+            self._connections.pop(room_id, None)
+
+    async def get_room_connections(self, room_ids: Iterable[int]) -> Dict[int, int]:
+        return {room_id: self._connections[room_id] for room_id in room_ids if room_id in self._connections}
+
+    async def _dispatch(self):
+        while True:
+            room_id, message = await self._queue.get()
+            callback = self.subscriptions.get(room_id)
+            if callback is None:
+                continue  # No local connections left in the room
+
+            # One bad event must not stop delivery for every room on the node
+            try:
+                mark_delivered(message)
+                events_delivered_total.labels(event_type_label(message.get("type"))).inc()
+                await callback(message)
+            except Exception as e:
+                logger.error("Error delivering event to room %s: %s", room_id, e)
+
+
+def create_broker(backend: str) -> Broker:
+    """
+    Create the broker for a BROKER_BACKEND value.
+
+    Args:
+        backend: "redis", "postgres" or "memory"
+
+    Returns:
+        The broker instance (not yet connected)
+    """
+    if backend == "memory":
+        return InProcessBroker()
+    if backend == "redis":
+        from app.websocket.redis_pubsub import redis_manager
+        return redis_manager
+    if backend == "postgres":
+        from app.websocket.postgres_broker import PostgresBroker
+        return PostgresBroker()
+    raise ValueError(f"Unknown BROKER_BACKEND: {backend}")
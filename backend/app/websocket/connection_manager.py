@@ -2,13 +2,115 @@
 WebSocket Connection Manager
 Manages WebSocket connections per room with proper isolation.
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from fastapi import WebSocket
 from collections import defaultdict
 import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.tracing import mark_sent
 
 logger = logging.getLogger(__name__)
 
+FANOUT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+STATS_WINDOW_SECONDS = 10  # Rates in room stats are averaged over this window
+
+
+def _collect_connection_gauges(gauge):
+    gauge.set(manager.get_total_connections())
+
+
+def _collect_room_connection_gauges(gauge):
+    # Only rooms with live connections on this node are exported
+    gauge.clear()
+    for room_id, connections in list(manager.active_connections.items()):
+        if connections:
+            gauge.labels(room_id).set(len(connections))
+
+
+ws_connections = registry.gauge(
+    "ws_connections", "Open WebSocket connections on this node", collect=_collect_connection_gauges
+)
+ws_room_connections = registry.gauge(
+    "ws_room_connections", "Open WebSocket connections on this node per room", ["room"],
+    collect=_collect_room_connection_gauges,
+)
+ws_broadcast_duration_seconds = registry.histogram(
+    "ws_broadcast_duration_seconds", "Time to fan one message out to a room's local connections"
+)
+ws_broadcast_recipients = registry.histogram(
+    "ws_broadcast_recipients", "Local connections a message was fanned out to", buckets=FANOUT_BUCKETS
+)
+ws_broadcasts_in_progress = registry.gauge(
+    "ws_broadcasts_in_progress", "Room broadcasts currently sending (outbound backlog on this node)"
+)
+ws_dropped_connections_total = registry.counter(
+    "ws_dropped_connections_total", "Connections dropped by the server", ["reason"]
+)
+
+
+class RollingCounter:
+    """
+    Events (and a size total, e.g. bytes) over the last STATS_WINDOW_SECONDS,
+    in one-second buckets. Adding is a few integer operations; old buckets
+    are reused in place.
+    """
+
+    __slots__ = ("_seconds", "_counts", "_amounts")
+
+    def __init__(self):
+        self._seconds = [0] * STATS_WINDOW_SECONDS
+        self._counts = [0] * STATS_WINDOW_SECONDS
+        self._amounts = [0] * STATS_WINDOW_SECONDS
+
+    def add(self, now: float, count: int = 1, amount: int = 0):
+        second = int(now)
+        index = second % STATS_WINDOW_SECONDS
+        if self._seconds[index] != second:
+            self._seconds[index] = second
+            self._counts[index] = count
+            self._amounts[index] = amount
+        else:
+            self._counts[index] += count
+            self._amounts[index] += amount
+
+    def rates(self, now: float) -> Tuple[float, float]:
+        """Average events and amount per second over the window ending now."""
+        oldest = int(now) - STATS_WINDOW_SECONDS
+        count = amount = 0
+        for index, second in enumerate(self._seconds):
+            if second > oldest:
+                count += self._counts[index]
+                amount += self._amounts[index]
+        return count / STATS_WINDOW_SECONDS, amount / STATS_WINDOW_SECONDS
+
+
+class RoomStats:
+    """Rolling activity counters for one room on this node."""
+
+    __slots__ = ("inbound", "outbound", "broadcasts_in_progress", "slow_consumers", "time_sends")
+
+    def __init__(self):
+        self.inbound = RollingCounter()  # Client frames received
+        self.outbound = RollingCounter()  # Frames and bytes sent to connections
+        self.broadcasts_in_progress = 0  # Fan-outs queued or sending for this room
+        self.slow_consumers: Dict[WebSocket, float] = {}  # Connection -> last slow send (perf_counter)
+        self.time_sends = False  # Time each send of the next broadcast to find slow consumers
+
+    def snapshot(self, now: float) -> dict:
+        recent = now - STATS_WINDOW_SECONDS
+        events_in, _ = self.inbound.rates(now)
+        events_out, bytes_out = self.outbound.rates(now)
+        return {
+            "events_in_per_second": round(events_in, 2),
+            "events_out_per_second": round(events_out, 2),
+            "bytes_out_per_second": round(bytes_out, 1),
+            "broadcasts_in_progress": self.broadcasts_in_progress,
+            "slow_consumers": sum(1 for at in self.slow_consumers.values() if at > recent),
+        }
+
 
 class ConnectionManager:
     """
@@ -23,6 +125,8 @@ class ConnectionManager:
         self.connection_users: Dict[WebSocket, int] = {}
         # Track total connection count
         self.total_connections: int = 0
+        # Room ID -> rolling activity counters (dropped with the room's last connection)
+        self.room_stats: Dict[int, RoomStats] = {}
 
     async def connect(self, websocket: WebSocket, room_id: int, user_id: int):
         """
@@ -37,12 +141,17 @@ class ConnectionManager:
         self.active_connections[room_id].append(websocket)
         self.connection_users[websocket] = user_id
         self.total_connections += 1
+        if room_id not in self.room_stats:
+            self.room_stats[room_id] = RoomStats()
 
-        logger.info(
-            f"User {user_id} connected to room {room_id}. "
-            f"Room has {len(self.active_connections[room_id])} connections. "
-            f"Total connections: {self.total_connections}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            room_connections = len(self.active_connections[room_id])
+            logger.info(
+                "User %s connected to room %s. Room has %d connections. Total connections: %d",
+                user_id, room_id, room_connections, self.total_connections,
+                extra={"event": "ws_connect", "room_id": room_id, "user_id": user_id,
+                       "room_connections": room_connections},
+            )
 
     def disconnect(self, websocket: WebSocket, room_id: int):
         """
@@ -57,15 +166,23 @@ class ConnectionManager:
             user_id = self.connection_users.pop(websocket, None)
             self.total_connections -= 1
 
+            stats = self.room_stats.get(room_id)
+            if stats is not None:
+                stats.slow_consumers.pop(websocket, None)
+
             # Clean up empty room lists
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
+                self.room_stats.pop(room_id, None)
 
-            logger.info(
-                f"User {user_id} disconnected from room {room_id}. "
-                f"Remaining connections in room: {len(self.active_connections.get(room_id, []))}. "
-                f"Total connections: {self.total_connections}"
-            )
+            if logger.isEnabledFor(logging.INFO):
+                room_connections = len(self.active_connections.get(room_id, ()))
+                logger.info(
+                    "User %s disconnected from room %s. Remaining connections in room: %d. Total connections: %d",
+                    user_id, room_id, room_connections, self.total_connections,
+                    extra={"event": "ws_disconnect", "room_id": room_id, "user_id": user_id,
+                           "room_connections": room_connections},
+                )
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """
@@ -78,9 +195,15 @@ class ConnectionManager:
         try:
             await websocket.send_text(message)
         except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
+            logger.error("Error sending personal message: %s", e)
 
-    async def broadcast_to_room(self, message: str, room_id: int, exclude_websocket: WebSocket = None):
+    async def broadcast_to_room(
+        self,
+        message: str,
+        room_id: int,
+        exclude_websocket: WebSocket = None,
+        trace: Optional[dict] = None
+    ):
         """
         Broadcast a message to all connections in a room.
 
@@ -88,29 +211,91 @@ class ConnectionManager:
             message: The message to broadcast
             room_id: The target room ID
             exclude_websocket: Optional WebSocket to exclude from broadcast (e.g., sender)
+            trace: Latency trace of the event, if it is being traced (see app.core.tracing)
         """
         if room_id not in self.active_connections:
-            logger.warning(f"Attempted to broadcast to non-existent room {room_id}")
+            logger.warning("Attempted to broadcast to non-existent room %s", room_id)
             return
 
         disconnected = []
         connections = self.active_connections[room_id]
+        stats = self.room_stats.get(room_id) or RoomStats()
+        slow_send = settings.WS_SLOW_CONSUMER_SECONDS
+        # Individual sends are only timed after a broadcast to this room ran slow
+        timed = stats.time_sends
+        found_slow = False
+        recipients = 0
+        start = time.perf_counter()
+        ws_broadcasts_in_progress.inc()
+        stats.broadcasts_in_progress += 1
 
-        for connection in connections:
-            # Skip the excluded connection (usually the sender)
-            if exclude_websocket and connection == exclude_websocket:
-                continue
+        try:
+            sent_at = start
+            for connection in connections:
+                # Skip the excluded connection (usually the sender)
+                if exclude_websocket and connection == exclude_websocket:
+                    continue
 
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
+                recipients += 1
+                try:
+                    await connection.send_text(message)
+                except Exception as e:
+                    logger.error("Error broadcasting to connection in room %s: %s", room_id, e)
+                    disconnected.append(connection)
+                if timed:
+                    sent = time.perf_counter()
+                    if sent - sent_at > slow_send:
+                        stats.slow_consumers[connection] = sent
+                        found_slow = True
+                    sent_at = sent
+        finally:
+            end = time.perf_counter()
+            ws_broadcasts_in_progress.dec()
+            ws_broadcast_duration_seconds.observe(end - start)
+            ws_broadcast_recipients.observe(recipients)
+            stats.broadcasts_in_progress -= 1
+            stats.time_sends = found_slow if timed else end - start > slow_send
+            # Frames are ASCII JSON (json.dumps escapes non-ASCII), so characters == bytes
+            stats.outbound.add(end, recipients, recipients * len(message))
+            mark_sent(trace)
 
         # Clean up any failed connections
         for connection in disconnected:
+            ws_dropped_connections_total.labels("send_failed").inc()
             self.disconnect(connection, room_id)
 
+    def record_inbound(self, room_id: int):
+        """
+        Count a frame received from a client in a room.
+
+        Args:
+            room_id: The room the frame was sent to
+        """
+        stats = self.room_stats.get(room_id)
+        if stats is not None:
+            stats.inbound.add(time.perf_counter())
+
+    def get_room_stats(self, room_id: int) -> Optional[dict]:
+        """
+        Get a room's live activity on this node.
+
+        Args:
+            room_id: The room ID
+
+        Returns:
+            Connections, per-second rates over the last STATS_WINDOW_SECONDS,
+            in-progress broadcasts and recent slow consumers; None when the
+            room has no connections here
+        """
+        stats = self.room_stats.get(room_id)
+        if stats is None:
+            return None
+        return {
+            "room_id": room_id,
+            "connections": self.get_room_connection_count(room_id),
+            **stats.snapshot(time.perf_counter()),
+        }
+
     def get_room_connection_count(self, room_id: int) -> int:
         """
         Get the number of active connections in a room.
@@ -0,0 +1,304 @@
+"""
+Postgres LISTEN/NOTIFY broker for deployments without Redis.
+
+Each node keeps one dedicated asyncpg connection that LISTENs on the channel
+of every room it has local connections in, and publishes with pg_notify over
+a small separate pool. NOTIFY payloads must stay under 8000 bytes; larger
+events are stored in broker_payloads and the notification carries a
+reference that receivers resolve. Live connection counts live in
+broker_presence, refreshed by every node like the Redis presence hashes.
+
+LISTEN needs a session-level connection: point PG_BROKER_URL at a direct
+(unpooled) endpoint when DATABASE_URL goes through a transaction pooler.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.tracing import mark_delivered
+from app.db.session import to_asyncpg_dsn
+from app.websocket.broker import Broker, event_type_label, events_delivered_total, events_published_total
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7999
+REF_PREFIX = "ref:"
+_RECONNECT_MIN_DELAY = 0.5
+_RECONNECT_MAX_DELAY = 30.0
+
+pg_broker_publish_duration_seconds = registry.histogram(
+    "pg_broker_publish_duration_seconds", "Latency of publishing one event with pg_notify"
+)
+pg_broker_publish_errors_total = registry.counter(
+    "pg_broker_publish_errors_total", "Events that failed to publish with pg_notify"
+)
+pg_broker_payload_refs_total = registry.counter(
+    "pg_broker_payload_refs_total", "Events sent by reference because they exceed the NOTIFY size limit"
+)
+pg_broker_reconnects_total = registry.counter(
+    "pg_broker_reconnects_total", "LISTEN connections re-established after being lost"
+)
+pg_broker_listening = registry.gauge(
+    "pg_broker_listening", "1 while the LISTEN connection is up"
+)
+
+
+class PostgresBroker(Broker):
+    """
+    Fans room events out across nodes with Postgres LISTEN/NOTIFY.
+
+    Notifications are queued by the connection's callback and delivered by
+    one dispatcher task in arrival order. A supervisor task reopens the
+    LISTEN connection (re-listening every subscribed room) when it drops or
+    stops answering keepalives; events published while it is down are lost,
+    as with Redis pub/sub.
+    """
+
+    name = "postgres"
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Callable] = {}  # channel -> callback
+        self._dsn: Optional[str] = None
+        self._pool: Optional[asyncpg.Pool] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self._listener_lock = asyncio.Lock()
+        self._lost = asyncio.Event()
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._tasks = []
+
+    def get_room_channel(self, room_id: int) -> str:
+        """
+        Get the NOTIFY channel name for a room.
+
+        Args:
+            room_id: The room ID
+
+        Returns:
+            Channel name in format "room:{room_id}"
+        """
+        return f"room:{room_id}"
+
+    async def connect(self):
+        """Open the publish pool and the LISTEN connection, and start background tasks."""
+        self._dsn = to_asyncpg_dsn(settings.PG_BROKER_URL or settings.DATABASE_URL)
+        try:
+            self._pool = await asyncpg.create_pool(
+                self._dsn, ssl=settings.DB_SSL, min_size=1, max_size=settings.PG_BROKER_POOL_SIZE
+            )
+            await self._open_listener()
+        except Exception as e:
+            logger.error("❌ Failed to connect Postgres broker: %s", e)
+            raise
+
+        self._tasks = [
+            asyncio.create_task(self._supervise()),
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._maintain()),
+        ]
+        logger.info("✅ Postgres broker listening")
+
+    async def disconnect(self):
+        """Stop background tasks, drop this node's presence and close connections."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        try:
+            if self._pool:
+                await self._pool.execute("DELETE FROM broker_presence WHERE node_id = $1", settings.NODE_ID)
+                await self._pool.close()
+            if self._listener and not self._listener.is_closed():
+                await self._listener.close()
+            logger.info("✅ Disconnected Postgres broker")
+        except Exception as e:
+            logger.error("Error disconnecting Postgres broker: %s", e)
+        finally:
+            self._pool = None
+            self._listener = None
+            pg_broker_listening.set(0)
+
+    async def publish(self, room_id: int, message: dict):
+        try:
+            channel = self.get_room_channel(room_id)
+            payload = json.dumps(message)
+
+            start = time.perf_counter()
+            async with self._pool.acquire() as conn:
+                if len(payload.encode()) > NOTIFY_MAX_BYTES:
+                    payload_id = await conn.fetchval(
+                        "INSERT INTO broker_payloads (payload) VALUES ($1) RETURNING id", payload
+                    )
+                    payload = f"{REF_PREFIX}{payload_id}"
+                    pg_broker_payload_refs_total.inc()
+                await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+            pg_broker_publish_duration_seconds.observe(time.perf_counter() - start)
+            events_published_total.labels(event_type_label(message.get("type"))).inc()
+        except Exception as e:
+            pg_broker_publish_errors_total.inc()
+            logger.error("Error publishing to Postgres: %s", e)
+
+    async def subscribe(self, room_id: int, callback: Callable):
+        channel = self.get_room_channel(room_id)
+        first = channel not in self.subscriptions
+        self.subscriptions[channel] = callback
+        if not first:
+            return
+        try:
+            async with self._listener_lock:
+                if self._listener is not None and not self._listener.is_closed():
+                    await self._listener.add_listener(channel, self._on_notify)
+            logger.info("✅ Listening on channel: %s", channel)
+        except Exception as e:
+            # The supervisor re-listens every subscribed channel when it reconnects
+            logger.error("Error listening on Postgres channel %s: %s", channel, e)
+
+    async def unsubscribe(self, room_id: int):
+        channel = self.get_room_channel(room_id)
+        if self.subscriptions.pop(channel, None) is None:
+            return
+        try:
+            async with self._listener_lock:
+                if self._listener is not None and not self._listener.is_closed():
+                    await self._listener.remove_listener(channel, self._on_notify)
+        except Exception as e:
+            logger.error("Error unlistening Postgres channel %s: %s", channel, e)
+
+    async def set_room_connections(self, room_id: int, count: int):
+        try:
+            if count > 0:
+                await self._pool.execute(
+                    """
+                    INSERT INTO broker_presence (node_id, room_id, connections, expires_at)
+                    VALUES ($1, $2, $3, now() + make_interval(secs => $4))
+                    ON CONFLICT (node_id, room_id)
+                    DO UPDATE SET connections = EXCLUDED.connections, expires_at = EXCLUDED.expires_at
+                    """,
+                    settings.NODE_ID, room_id, count, float(settings.ROOM_PRESENCE_TTL_SECONDS),
+                )
+            else:
+                await self._pool.execute(
+                    "DELETE FROM broker_presence WHERE node_id = $1 AND room_id = $2",
+                    settings.NODE_ID, room_id,
+                )
+        except Exception as e:
+            logger.error("Error updating room presence: %s", e)
+
+    async def get_room_connections(self, room_ids: Iterable[int]) -> Dict[int, int]:
+        room_ids = list(room_ids)
+        if not room_ids:
+            return {}
+        rows = await self._pool.fetch(
+            """
+            SELECT room_id, SUM(connections)::int AS connections
+            FROM broker_presence
+            WHERE room_id = ANY($1::int[]) AND expires_at > now()
+            GROUP BY room_id
+            """,
+            room_ids,
+        )
+        return {row["room_id"]: row["connections"] for row in rows if row["connections"]}
+
+    def pending_events(self) -> int:
+        return self._inbox.qsize()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str):
+        """asyncpg notification callback: hand off to the dispatcher."""
+        self._inbox.put_nowait((channel, payload))
+
+    def _on_terminate(self, connection):
+        self._lost.set()
+
+    async def _open_listener(self):
+        """Open a LISTEN connection and listen on every subscribed channel."""
+        async with self._listener_lock:
+            connection = await asyncpg.connect(self._dsn, ssl=settings.DB_SSL)
+            connection.add_termination_listener(self._on_terminate)
+            for channel in list(self.subscriptions):
+                await connection.add_listener(channel, self._on_notify)
+            self._listener = connection
+            self._lost.clear()
+            pg_broker_listening.set(1)
+
+    async def _supervise(self):
+        """Reconnect the LISTEN connection when it is lost, with exponential backoff."""
+        delay = _RECONNECT_MIN_DELAY
+        while True:
+            if self._listener is None or self._listener.is_closed():
+                pg_broker_listening.set(0)
+                try:
+                    await self._open_listener()
+                    pg_broker_reconnects_total.inc()
+                    logger.warning("Postgres broker LISTEN connection re-established")
+                    delay = _RECONNECT_MIN_DELAY
+                except Exception as e:
+                    logger.error("Postgres broker reconnect failed (retrying in %.1fs): %s", delay, e)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, _RECONNECT_MAX_DELAY)
+                    continue
+
+            try:
+                await asyncio.wait_for(self._lost.wait(), timeout=settings.PG_BROKER_KEEPALIVE_SECONDS)
+                logger.error("Postgres broker LISTEN connection lost")
+            except asyncio.TimeoutError:
+                # Catch connections that died without the server closing them
+                try:
+                    async with self._listener_lock:
+                        await asyncio.wait_for(self._listener.execute("SELECT 1"), timeout=5)
+                except Exception as e:
+                    logger.error("Postgres broker keepalive failed: %s", e)
+                    self._listener.terminate()
+
+    async def _dispatch(self):
+        """Deliver queued notifications to their channel's callback, in order."""
+        while True:
+            channel, payload = await self._inbox.get()
+            callback = self.subscriptions.get(channel)
+            if callback is None:
+                continue
+
+            try:
+                if payload.startswith(REF_PREFIX):
+                    payload = await self._pool.fetchval(
+                        "SELECT payload FROM broker_payloads WHERE id = $1", int(payload[len(REF_PREFIX):])
+                    )
+                    if payload is None:
+                        logger.warning("Referenced payload on %s was already pruned", channel)
+                        continue
+                data = json.loads(payload)
+            except Exception as e:
+                logger.error("Error reading notification on %s: %s", channel, e)
+                continue
+
+            # One bad event must not stop delivery for every room on the node
+            try:
+                mark_delivered(data)
+                events_delivered_total.labels(event_type_label(data.get("type"))).inc()
+                await callback(data)
+            except Exception as e:
+                logger.error("Error delivering event on %s: %s", channel, e)
+
+    async def _maintain(self):
+        """Keep this node's presence alive and prune expired presence and old payloads."""
+        interval = max(1, settings.ROOM_PRESENCE_TTL_SECONDS // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._pool.execute(
+                    "UPDATE broker_presence SET expires_at = now() + make_interval(secs => $2) WHERE node_id = $1",
+                    settings.NODE_ID, float(settings.ROOM_PRESENCE_TTL_SECONDS),
+                )
+                await self._pool.execute("DELETE FROM broker_presence WHERE expires_at < now()")
+                await self._pool.execute(
+                    "DELETE FROM broker_payloads WHERE created_at < now() - make_interval(secs => $1)",
+                    float(settings.PG_BROKER_PAYLOAD_RETENTION_SECONDS),
+                )
+            except Exception as e:
+                logger.error("Error maintaining Postgres broker tables: %s", e)
@@ -5,23 +5,167 @@ Handles publishing and subscribing to room-specific channels.
 import json
 import asyncio
 import logging
-from typing import Callable, Dict
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import redis.asyncio as redis
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.tracing import mark_delivered
+from app.websocket.broker import Broker, event_type_label, events_delivered_total, events_published_total
 
 logger = logging.getLogger(__name__)
 
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
 
-class RedisPubSubManager:
+redis_publish_duration_seconds = registry.histogram(
+    "redis_publish_duration_seconds", "Time from publish() until the event reached Redis"
+)
+redis_publish_errors_total = registry.counter(
+    "redis_publish_errors_total", "Events that failed to publish to Redis"
+)
+redis_publish_batch_size = registry.histogram(
+    "redis_publish_batch_size", "Events sent to Redis in one publish pipeline", buckets=BATCH_SIZE_BUCKETS
+)
+redis_publish_batch_duration_seconds = registry.histogram(
+    "redis_publish_batch_duration_seconds", "Round trip of one publish pipeline"
+)
+redis_publish_queued = registry.gauge(
+    "redis_publish_queued", "Events waiting to be sent to Redis",
+    collect=lambda gauge: gauge.set(redis_manager.publisher.queued()),
+)
+redis_subscriptions = registry.gauge(
+    "redis_subscriptions", "Room channels this node is subscribed to",
+    collect=lambda gauge: gauge.set(len(redis_manager.subscriptions)),
+)
+
+# Live connection counts: one hash per node (room_id -> count) plus a set of node IDs.
+# Each node's hash expires unless refreshed, so a crashed node's counts disappear.
+PRESENCE_KEY_PREFIX = "room_presence:"
+PRESENCE_NODES_KEY = "room_presence:nodes"
+
+
+# (channel, JSON payload, event type label, time publish() was called)
+_Pending = Tuple[str, str, str, float]
+
+
+class _PublishShard:
+    """One ordered queue of pending publishes and the task that flushes it."""
+
+    def __init__(self, max_queued: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.full = asyncio.Event()  # Set when a whole batch is waiting
+        self.task: Optional[asyncio.Task] = None
+
+
+class RedisBatchPublisher:
+    """
+    Publishes events through a dedicated connection pool in pipelined batches.
+
+    publish() only queues the event, so a client's receive loop doesn't wait
+    for a Redis round trip. Each room maps to one of REDIS_PUBLISH_POOL_SIZE
+    shards, which keeps a room's events in order. A shard's flusher waits up
+    to REDIS_PUBLISH_MAX_LATENCY_SECONDS after the first queued event, or less
+    if REDIS_PUBLISH_MAX_BATCH events are already waiting. It then sends them
+    all in one pipeline. Events queued during a round trip go out in the next
+    batch. A full queue (REDIS_PUBLISH_MAX_QUEUED per shard) makes publish()
+    wait, which pushes back on the publishers.
+    """
+
+    def __init__(self):
+        self.client: Optional[redis.Redis] = None
+        self.max_batch = settings.REDIS_PUBLISH_MAX_BATCH
+        self.max_latency = settings.REDIS_PUBLISH_MAX_LATENCY_SECONDS
+        self._shards: List[_PublishShard] = []
+
+    def queued(self) -> int:
+        return sum(shard.queue.qsize() for shard in self._shards)
+
+    async def start(self):
+        """Open the publish pool and start one flusher per shard."""
+        self.client = redis.from_url(settings.redis_url, max_connections=settings.REDIS_PUBLISH_POOL_SIZE)
+        self._shards = [_PublishShard(settings.REDIS_PUBLISH_MAX_QUEUED) for _ in range(settings.REDIS_PUBLISH_POOL_SIZE)]
+        for shard in self._shards:
+            shard.task = asyncio.create_task(self._flush_loop(shard))
+
+    async def stop(self, timeout: float = 5.0):
+        """Send what is still queued (waiting at most `timeout` seconds), then close the pool."""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(shard.queue.join() for shard in self._shards)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropped %d unsent Redis publishes at shutdown", self.queued())
+        for shard in self._shards:
+            shard.task.cancel()
+        await asyncio.gather(*(shard.task for shard in self._shards), return_exceptions=True)
+        self._shards = []
+        if self.client:
+            await self.client.close()
+            self.client = None
+
+    async def publish(self, room_id: int, channel: str, payload: str, event_type: str):
+        shard = self._shards[room_id % len(self._shards)]
+        await shard.queue.put((channel, payload, event_type, time.perf_counter()))
+        if shard.queue.qsize() >= self.max_batch - 1:
+            shard.full.set()
+
+    async def _flush_loop(self, shard: _PublishShard):
+        queue = shard.queue
+        while True:
+            batch: List[_Pending] = [await queue.get()]
+            if self.max_latency > 0:
+                shard.full.clear()
+                if queue.qsize() < self.max_batch - 1:
+                    try:
+                        await asyncio.wait_for(shard.full.wait(), self.max_latency)
+                    except asyncio.TimeoutError:
+                        pass
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._send(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _send(self, batch: List[_Pending]):
+        start = time.perf_counter()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for channel, payload, _, _ in batch:
+                    pipe.publish(channel, payload)
+                await pipe.execute()
+        except Exception as e:
+            redis_publish_errors_total.inc(len(batch))
+            logger.error("Error publishing %d events to Redis: %s", len(batch), e)
+            return
+
+        end = time.perf_counter()
+        redis_publish_batch_size.observe(len(batch))
+        redis_publish_batch_duration_seconds.observe(end - start)
+        for _, _, event_type, queued_at in batch:
+            redis_publish_duration_seconds.observe(end - queued_at)
+            events_published_total.labels(event_type).inc()
+
+
+class RedisPubSubManager(Broker):
     """
     Manages Redis Pub/Sub for WebSocket message broadcasting.
     Allows horizontal scaling across multiple servers.
+
+    One listener task reads the shared pub/sub connection and dispatches each
+    message to the callback of the channel it arrived on.
     """
 
+    name = "redis"
+
     def __init__(self):
         self.redis_client: redis.Redis = None
         self.pubsub: redis.client.PubSub = None
         self.subscriptions: Dict[str, Callable] = {}  # channel -> callback
+        self.presence_key = f"{PRESENCE_KEY_PREFIX}{settings.NODE_ID}"
+        self._presence_task: asyncio.Task = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self.publisher = RedisBatchPublisher()
 
     async def connect(self):
         """Initialize Redis connection and pub/sub client."""
@@ -35,21 +179,38 @@ class RedisPubSubManager:
 
             # Test connection
             await self.redis_client.ping()
-            logger.info(f"✅ Connected to Redis at {settings.redis_url}")
+            logger.info("✅ Connected to Redis at %s", settings.redis_url)
+
+            # Publishes use their own pool so commands (presence, caches) never queue behind them
+            await self.publisher.start()
+
+            await self.redis_client.sadd(PRESENCE_NODES_KEY, settings.NODE_ID)
+            self._presence_task = asyncio.create_task(self._refresh_presence())
         except Exception as e:
-            logger.error(f"❌ Failed to connect to Redis: {e}")
+            logger.error("❌ Failed to connect to Redis: %s", e)
             raise
 
     async def disconnect(self):
         """Close Redis connections gracefully."""
         try:
+            if self._presence_task:
+                self._presence_task.cancel()
+                self._presence_task = None
+            if self._listener_task:
+                self._listener_task.cancel()
+                self._listener_task = None
+            await self.publisher.stop()
+            if self.redis_client:
+                # Graceful shutdown: drop this node's counts right away
+                await self.redis_client.delete(self.presence_key)
+                await self.redis_client.srem(PRESENCE_NODES_KEY, settings.NODE_ID)
             if self.pubsub:
                 await self.pubsub.close()
             if self.redis_client:
                 await self.redis_client.close()
             logger.info("✅ Disconnected from Redis")
         except Exception as e:
-            logger.error(f"Error disconnecting from Redis: {e}")
+            logger.error("Error disconnecting from Redis: %s", e)
 
     def get_room_channel(self, room_id: int) -> str:
         """
@@ -68,6 +229,9 @@ class RedisPubSubManager:
         Publish a message to a room's Redis channel.
         All servers subscribed to this channel will receive the message.
 
+        The event is queued for the batching publisher; this returns once it
+        is queued, not when Redis has it (see RedisBatchPublisher).
+
         Args:
             room_id: The target room ID
             message: The message data (will be JSON serialized)
@@ -76,10 +240,11 @@ class RedisPubSubManager:
             channel = self.get_room_channel(room_id)
             message_json = json.dumps(message)
 
-            await self.redis_client.publish(channel, message_json)
-            logger.debug(f"Published to {channel}: {message.get('type', 'unknown')}")
+            await self.publisher.publish(room_id, channel, message_json, event_type_label(message.get("type")))
+            logger.debug("Queued publish to %s: %s", channel, message.get("type", "unknown"))
         except Exception as e:
-            logger.error(f"Error publishing to Redis: {e}")
+            redis_publish_errors_total.inc()
+            logger.error("Error publishing to Redis: %s", e)
 
     async def subscribe(self, room_id: int, callback: Callable):
         """
@@ -97,12 +262,13 @@ class RedisPubSubManager:
             await self.pubsub.subscribe(channel)
             self.subscriptions[channel] = callback
 
-            logger.info(f"✅ Subscribed to channel: {channel}")
+            logger.info("✅ Subscribed to channel: %s", channel)
 
-            # Start listening in background
-            asyncio.create_task(self._listen(channel))
+            # The listener stops when the last channel is unsubscribed; restart it
+            if self._listener_task is None or self._listener_task.done():
+                self._listener_task = asyncio.create_task(self._listen())
         except Exception as e:
-            logger.error(f"Error subscribing to Redis channel: {e}")
+            logger.error("Error subscribing to Redis channel: %s", e)
 
     async def unsubscribe(self, room_id: int):
         """
@@ -117,33 +283,105 @@ class RedisPubSubManager:
             await self.pubsub.unsubscribe(channel)
             self.subscriptions.pop(channel, None)
 
-            logger.info(f"✅ Unsubscribed from channel: {channel}")
+            logger.info("✅ Unsubscribed from channel: %s", channel)
+        except Exception as e:
+            logger.error("Error unsubscribing from Redis channel: %s", e)
+
+    async def set_room_connections(self, room_id: int, count: int):
+        """
+        Record this node's live connection count for a room.
+
+        Args:
+            room_id: The room ID
+            count: Number of local WebSocket connections in the room
+        """
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                if count > 0:
+                    pipe.hset(self.presence_key, str(room_id), count)
+                else:
+                    pipe.hdel(self.presence_key, str(room_id))
+                pipe.expire(self.presence_key, settings.ROOM_PRESENCE_TTL_SECONDS)
+                await pipe.execute()
         except Exception as e:
-            logger.error(f"Error unsubscribing from Redis channel: {e}")
+            logger.error("Error updating room presence: %s", e)
 
-    async def _listen(self, channel: str):
+    async def get_room_connections(self, room_ids: Iterable[int]) -> Dict[int, int]:
         """
-        Background task to listen for messages on a subscribed channel.
+        Live connection counts for rooms, summed across all nodes.
 
         Args:
-            channel: The Redis channel to listen to
+            room_ids: Rooms to look up
+
+        Returns:
+            Dict of room_id -> connection count (rooms with none are omitted)
         """
+        fields = [str(room_id) for room_id in room_ids]
+        if not fields:
+            return {}
+
+        nodes = await self.redis_client.smembers(PRESENCE_NODES_KEY)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for node in nodes:
+                pipe.hmget(f"{PRESENCE_KEY_PREFIX}{node}", fields)
+            per_node = await pipe.execute()
+
+        counts: Dict[int, int] = {}
+        for values in per_node:
+            for field, value in zip(fields, values):
+                if value:
+                    counts[int(field)] = counts.get(int(field), 0) + int(value)
+        return counts
+
+    async def _refresh_presence(self):
+        """Keep this node's presence hash alive and prune nodes whose hash expired."""
+        interval = max(1, settings.ROOM_PRESENCE_TTL_SECONDS // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.redis_client.expire(self.presence_key, settings.ROOM_PRESENCE_TTL_SECONDS)
+                await self.redis_client.sadd(PRESENCE_NODES_KEY, settings.NODE_ID)
+                for node in await self.redis_client.smembers(PRESENCE_NODES_KEY):
+                    if node != settings.NODE_ID and not await self.redis_client.exists(f"{PRESENCE_KEY_PREFIX}{node}"):
+                        await self.redis_client.srem(PRESENCE_NODES_KEY, node)
+            except Exception as e:
+                logger.error("Error refreshing room presence: %s", e)
+
+    async def _listen(self):
+        """Background task dispatching pub/sub messages to their channel's callback."""
         try:
             async for message in self.pubsub.listen():
-                if message["type"] == "message":
-                    # Parse JSON message
-                    data = json.loads(message["data"])
-
-                    # Call the registered callback
-                    callback = self.subscriptions.get(channel)
-                    if callback:
-                        await callback(data)
-                    else:
-                        logger.warning(f"No callback registered for channel: {channel}")
+                if message["type"] != "message":
+                    continue
+
+                # One bad event must not stop delivery for every room on the node
+                channel = message["channel"]
+                try:
+                    await self._deliver(channel, message["data"])
+                except Exception as e:
+                    logger.error("Error delivering event on %s: %s", channel, e)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error in Redis listener for {channel}: {e}")
-            # Clean up subscription
-            self.subscriptions.pop(channel, None)
+            # The pub/sub connection itself failed
+            logger.error("Error in Redis listener: %s", e)
+
+    async def _deliver(self, channel: str, payload: str):
+        """Decode one pub/sub message and hand it to its channel's callback."""
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("Invalid JSON on channel %s", channel)
+            return
+        mark_delivered(data)
+        events_delivered_total.labels(event_type_label(data.get("type"))).inc()
+
+        # Call the registered callback
+        callback = self.subscriptions.get(channel)
+        if callback:
+            await callback(data)
+        else:
+            logger.warning("No callback registered for channel: %s", channel)
 
 
 # Global Redis Pub/Sub Manager instance
@@ -0,0 +1,102 @@
+"""
+Benchmark: worker cold-start time.
+
+Measures, in fresh interpreter processes:
+- import: time to import app.main (module load, router registration)
+- startup: time for the FastAPI lifespan startup to complete
+- first_query: latency of the first database query after startup
+
+Startup is measured for three configurations:
+- create_all:   DB_AUTO_CREATE=True,  DB_POOL_PREWARM=0 (previous behaviour)
+- migrations:   DB_AUTO_CREATE=False, DB_POOL_PREWARM=0
+- prewarmed:    DB_AUTO_CREATE=False, DB_POOL_PREWARM=--prewarm
+
+The startup scenarios need the configured DATABASE_URL and Redis to be reachable.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup --runs 5 --prewarm 5
+    python -m benchmarks.bench_startup --import-only
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "create_all": {"DB_AUTO_CREATE": "True", "DB_POOL_PREWARM": "0"},
+    "migrations": {"DB_AUTO_CREATE": "False", "DB_POOL_PREWARM": "0"},
+    "prewarmed": {"DB_AUTO_CREATE": "False"},  # DB_POOL_PREWARM set from --prewarm
+}
+
+
+async def _child(import_only: bool) -> dict:
+    """Runs inside the measured process."""
+    start = time.perf_counter()
+    from app.main import app
+    result = {"import_s": time.perf_counter() - start}
+    if import_only:
+        return result
+
+    from sqlalchemy import text
+    from app.db.session import AsyncSessionLocal
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        result["startup_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+        result["first_query_s"] = time.perf_counter() - start
+    return result
+
+
+def _measure(env_overrides: dict, import_only: bool) -> dict:
+    env = {**os.environ, **env_overrides}
+    args = [sys.executable, "-m", "benchmarks.bench_startup", "--child"]
+    if import_only:
+        args.append("--import-only")
+    output = subprocess.run(args, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _summarize(samples: list) -> dict:
+    keys = samples[0].keys()
+    return {
+        key: {
+            "median_ms": round(statistics.median(s[key] for s in samples) * 1000, 1),
+            "min_ms": round(min(s[key] for s in samples) * 1000, 1),
+        }
+        for key in keys
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--prewarm", type=int, default=5, help="DB_POOL_PREWARM for the prewarmed scenario")
+    parser.add_argument("--import-only", action="store_true", help="Only measure module import time")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.import_only))))
+        return
+
+    report = {"runs": args.runs}
+    if args.import_only:
+        report["import"] = _summarize([_measure({}, True) for _ in range(args.runs)])
+    else:
+        for name, overrides in SCENARIOS.items():
+            overrides = {"DB_POOL_PREWARM": str(args.prewarm), **overrides}
+            report[name] = _summarize([_measure(overrides, False) for _ in range(args.runs)])
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
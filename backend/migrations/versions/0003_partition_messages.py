@@ -0,0 +1,117 @@
+"""Partition messages by month on created_at
+
+Rebuilds messages as a RANGE-partitioned table with one partition per month
+(messages_pYYYYMM) plus a default partition, and copies existing rows over.
+The primary key becomes (id, created_at) as required for partitioning; ids
+keep coming from the existing sequence, so they stay unique.
+The single-column room_id/created_at indexes are replaced by a composite
+(room_id, created_at) index that matches the room history query.
+
+Upcoming partitions are created by `python -m app.db.partitions ensure`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+COLUMNS = "id, room_id, user_id, content, created_at"
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + (month.month - 1) + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # exec_driver_sql: partition bounds contain ':' which text() would treat as bind params
+    run = bind.exec_driver_sql
+
+    # Move the old heap aside; its indexes are dropped up front so the copy is cheap
+    # and their names are free for the new table.
+    for index in ("ix_messages_id", "ix_messages_room_id", "ix_messages_user_id",
+                  "ix_messages_created_at", "ix_messages_search_vector"):
+        run(f"DROP INDEX IF EXISTS {index}")
+    run("ALTER TABLE messages RENAME TO messages_legacy")
+    run("ALTER TABLE messages_legacy RENAME CONSTRAINT messages_pkey TO messages_legacy_pkey")
+    run("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+
+    run("""
+        CREATE TABLE messages (
+            id integer NOT NULL DEFAULT nextval('messages_id_seq'),
+            room_id integer NOT NULL REFERENCES rooms (id) ON DELETE CASCADE,
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            content text NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    run("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+    run("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+
+    # One partition per month from the oldest message through MONTHS_AHEAD months out
+    now = datetime.now(timezone.utc)
+    current = date(now.year, now.month, 1)
+    oldest = run(
+        "SELECT date_trunc('month', min(created_at) AT TIME ZONE 'UTC')::date FROM messages_legacy"
+    ).scalar() or current
+    month = min(oldest, current)
+    while month <= _add_months(current, MONTHS_AHEAD):
+        name = f"messages_p{month.year:04d}{month.month:02d}"
+        run(
+            f"CREATE TABLE {name} PARTITION OF messages "
+            f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(_add_months(month, 1))})"
+        )
+        month = _add_months(month, 1)
+
+    run(f"INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM messages_legacy")
+    run("DROP TABLE messages_legacy")
+
+    # Partitioned indexes (created on every partition automatically)
+    run("CREATE INDEX ix_messages_room_id_created_at ON messages (room_id, created_at)")
+    run("CREATE INDEX ix_messages_user_id ON messages (user_id)")
+    run("CREATE INDEX ix_messages_search_vector ON messages USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    run = op.get_bind().exec_driver_sql
+
+    run("ALTER SEQUENCE messages_id_seq OWNED BY NONE")
+    run("""
+        CREATE TABLE messages_unpartitioned (
+            id integer NOT NULL DEFAULT nextval('messages_id_seq') PRIMARY KEY,
+            room_id integer NOT NULL REFERENCES rooms (id) ON DELETE CASCADE,
+            user_id integer NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            content text NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED
+        )
+    """)
+    run(f"INSERT INTO messages_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM messages")
+    run("DROP TABLE messages")
+    run("ALTER TABLE messages_unpartitioned RENAME TO messages")
+    run("ALTER TABLE messages RENAME CONSTRAINT messages_unpartitioned_pkey TO messages_pkey")
+    run("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+
+    run("CREATE INDEX ix_messages_id ON messages (id)")
+    run("CREATE INDEX ix_messages_room_id ON messages (room_id)")
+    run("CREATE INDEX ix_messages_user_id ON messages (user_id)")
+    run("CREATE INDEX ix_messages_created_at ON messages (created_at)")
+    run("CREATE INDEX ix_messages_search_vector ON messages USING GIN (search_vector)")
@@ -0,0 +1,42 @@
+"""Drop indexes duplicating primary keys; add composite listing indexes
+
+- ix_users_id, ix_rooms_id, ix_notes_id duplicate their primary key indexes
+- ix_notes_room_id is replaced by (room_id, created_at) for board loads
+- ix_rooms_created_at backs the newest-first room listing
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_index("ix_rooms_id", table_name="rooms")
+    op.drop_index("ix_notes_id", table_name="notes")
+
+    op.create_index("ix_notes_room_id_created_at", "notes", ["room_id", "created_at"])
+    op.drop_index("ix_notes_room_id", table_name="notes")
+
+    op.create_index("ix_rooms_created_at", "rooms", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rooms_created_at", table_name="rooms")
+
+    op.create_index("ix_notes_room_id", "notes", ["room_id"])
+    op.drop_index("ix_notes_room_id_created_at", table_name="notes")
+
+    op.create_index("ix_notes_id", "notes", ["id"])
+    op.create_index("ix_rooms_id", "rooms", ["id"])
+    op.create_index("ix_users_id", "users", ["id"])
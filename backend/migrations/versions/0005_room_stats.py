@@ -0,0 +1,50 @@
+"""Room activity counters (room_stats), backfilled from existing rows
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "room_stats",
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("message_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("note_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_activity_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    op.execute("""
+        INSERT INTO room_stats (room_id, message_count, note_count, last_activity_at)
+        SELECT r.id,
+               COALESCE(m.message_count, 0),
+               COALESCE(n.note_count, 0),
+               GREATEST(r.created_at, m.last_message_at, n.last_note_at)
+        FROM rooms r
+        LEFT JOIN (
+            SELECT room_id, count(*) AS message_count, max(created_at) AS last_message_at
+            FROM messages GROUP BY room_id
+        ) m ON m.room_id = r.id
+        LEFT JOIN (
+            SELECT room_id, count(*) AS note_count, max(updated_at) AS last_note_at
+            FROM notes GROUP BY room_id
+        ) n ON n.room_id = r.id
+    """)
+
+    op.create_index("ix_room_stats_last_activity_at", "room_stats", ["last_activity_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("room_stats")
@@ -0,0 +1,41 @@
+"""Tables for the Postgres LISTEN/NOTIFY broker (large payloads, presence)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "broker_payloads",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_broker_payloads_created_at", "broker_payloads", ["created_at"])
+
+    op.create_table(
+        "broker_presence",
+        sa.Column("node_id", sa.String(255), primary_key=True),
+        sa.Column("room_id", sa.Integer(), primary_key=True),
+        sa.Column("connections", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_broker_presence_room_id", "broker_presence", ["room_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("broker_presence")
+    op.drop_table("broker_payloads")
@@ -199,6 +199,60 @@ else
 fi
 echo ""
 
+# Test 11: Admin endpoints reject regular users
+echo -e "${YELLOW}Test 11: Access Admin Loop Monitor (As Regular User)${NC}"
+if [ -n "$TOKEN" ]; then
+    RESPONSE=$(curl -s -X GET "http://localhost:8000/api/admin/loop-monitor" \
+      -H "Authorization: Bearer $TOKEN")
+
+    echo "Response: $RESPONSE"
+
+    if echo "$RESPONSE" | grep -q "Superuser privileges required"; then
+        print_result 0 "Admin endpoint rejected regular user"
+    else
+        print_result 1 "Admin endpoint did not reject regular user"
+    fi
+else
+    print_result 1 "No token available for test"
+fi
+echo ""
+
+# Test 12: Room inspection is admin-only too
+echo -e "${YELLOW}Test 12: Access Admin Room Inspection (As Regular User)${NC}"
+if [ -n "$TOKEN" ]; then
+    RESPONSE=$(curl -s -X GET "http://localhost:8000/api/admin/rooms?limit=5" \
+      -H "Authorization: Bearer $TOKEN")
+
+    echo "Response: $RESPONSE"
+
+    if echo "$RESPONSE" | grep -q "Superuser privileges required"; then
+        print_result 0 "Room inspection rejected regular user"
+    else
+        print_result 1 "Room inspection did not reject regular user"
+    fi
+else
+    print_result 1 "No token available for test"
+fi
+echo ""
+
+# Test 13: Profiling is admin-only
+echo -e "${YELLOW}Test 13: Request Profiling Token (As Regular User)${NC}"
+if [ -n "$TOKEN" ]; then
+    RESPONSE=$(curl -s -X POST "http://localhost:8000/api/admin/profiling/token" \
+      -H "Authorization: Bearer $TOKEN")
+
+    echo "Response: $RESPONSE"
+
+    if echo "$RESPONSE" | grep -q "Superuser privileges required"; then
+        print_result 0 "Profiling rejected regular user"
+    else
+        print_result 1 "Profiling did not reject regular user"
+    fi
+else
+    print_result 1 "No token available for test"
+fi
+echo ""
+
 # Summary
 echo "========================================="
 echo "  Test Summary"
@@ -163,6 +163,21 @@ else
 fi
 echo ""
 
+# Test 6b: Full-text search in room
+echo -e "${YELLOW}Test 6b: Search Messages in Room${NC}"
+RESPONSE=$(curl -s -G "$BASE_URL/rooms/$ROOM_ID/search" \
+  --data-urlencode "q=second message" \
+  -H "Authorization: Bearer $TOKEN")
+
+echo "Response: $RESPONSE"
+
+if echo "$RESPONSE" | grep -q "This is my second message!"; then
+    print_result 0 "Search returned matching message"
+else
+    print_result 1 "Search did not return matching message"
+fi
+echo ""
+
 # Test 7: Get messages without authentication
 echo -e "${YELLOW}Test 7: Get Messages Without Authentication${NC}"
 RESPONSE=$(curl -s -X GET "$BASE_URL/rooms/$ROOM_ID/messages")
@@ -196,6 +196,38 @@ else
 fi
 echo ""
 
+# Test 7b: Repeated reads are served from the room content cache
+echo -e "${YELLOW}Test 7b: Notes List Served From Cache${NC}"
+sleep 2  # Let the post-write hold window pass
+curl -s -o /dev/null "$BASE_URL/rooms/$ROOM_ID/notes" -H "Authorization: Bearer $TOKEN"
+HEADERS=$(curl -s -D - -o /dev/null "$BASE_URL/rooms/$ROOM_ID/notes" \
+  -H "Authorization: Bearer $TOKEN")
+
+echo "Headers: $HEADERS"
+
+if echo "$HEADERS" | grep -qi "x-cache: \(local\|redis\)"; then
+    print_result 0 "Second read served from cache"
+else
+    print_result 1 "Second read not served from cache"
+fi
+echo ""
+
+# Test 7c: Conditional GET with the room's ETag
+echo -e "${YELLOW}Test 7c: Notes List Returns 304 for Current ETag${NC}"
+ETAG=$(echo "$HEADERS" | grep -i "^etag:" | cut -d' ' -f2- | tr -d '\r')
+STATUS=$(curl -s -o /dev/null -w "%{http_code}" "$BASE_URL/rooms/$ROOM_ID/notes" \
+  -H "Authorization: Bearer $TOKEN" \
+  -H "If-None-Match: $ETAG")
+
+echo "ETag: $ETAG, Status: $STATUS"
+
+if [ "$STATUS" = "304" ]; then
+    print_result 0 "Unchanged notes list returned 304"
+else
+    print_result 1 "Expected 304 for unchanged notes list"
+fi
+echo ""
+
 # Test 8: Get notes without authentication
 echo -e "${YELLOW}Test 8: Get Notes Without Authentication${NC}"
 RESPONSE=$(curl -s -X GET "$BASE_URL/rooms/$ROOM_ID/notes")
@@ -382,6 +414,34 @@ else
 fi
 echo ""
 
+# Test 18: Batch create/update/delete notes
+echo -e "${YELLOW}Test 18: Batch Create/Update/Delete Notes${NC}"
+if [ -n "$NOTE_ID_2" ]; then
+    RESPONSE=$(curl -s -X POST "$BASE_URL/rooms/$ROOM_ID/notes:batch" \
+      -H "Authorization: Bearer $TOKEN" \
+      -H "Content-Type: application/json" \
+      -d '{
+        "operations": [
+          {"op": "create", "content": "Batch note", "position_x": 10, "position_y": 20},
+          {"op": "update", "id": '"$NOTE_ID_2"', "position_x": 700, "color": "#4CAF50"},
+          {"op": "delete", "id": 99999}
+        ]
+      }')
+
+    echo "Response: $RESPONSE"
+
+    if echo "$RESPONSE" | grep -q "\"status\":\"created\"" && \
+       echo "$RESPONSE" | grep -q "\"status\":\"updated\"" && \
+       echo "$RESPONSE" | grep -q "\"status\":\"not_found\""; then
+        print_result 0 "Batch operations applied with per-item results"
+    else
+        print_result 1 "Batch operations failed"
+    fi
+else
+    print_result 1 "No note ID available for test"
+fi
+echo ""
+
 # Cleanup: Delete the test room
 echo -e "${YELLOW}Cleanup: Delete Test Room${NC}"
 if [ -n "$ROOM_ID" ]; then
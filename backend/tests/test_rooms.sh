@@ -106,6 +106,20 @@ else
 fi
 echo ""
 
+# Test 3b: Rooms sorted by activity include counters
+echo -e "${YELLOW}Test 3b: Get Rooms Sorted by Activity${NC}"
+RESPONSE=$(curl -s -X GET "$BASE_URL/rooms/?sort=activity" \
+  -H "Authorization: Bearer $TOKEN")
+
+echo "Response: $RESPONSE"
+
+if echo "$RESPONSE" | grep -q "\"message_count\"" && echo "$RESPONSE" | grep -q "\"active_connections\""; then
+    print_result 0 "Retrieved rooms with activity counters"
+else
+    print_result 1 "Rooms list missing activity counters"
+fi
+echo ""
+
 # Test 4: Get specific room by ID
 echo -e "${YELLOW}Test 4: Get Specific Room by ID${NC}"
 if [ -n "$ROOM_ID" ]; then